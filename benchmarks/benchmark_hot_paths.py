@@ -0,0 +1,353 @@
+"""Benchmarks of the CLI hot paths on synthetic projects.
+
+Usage:
+    python -m benchmarks.benchmark_hot_paths --output benchmark_results.json
+    python -m benchmarks.benchmark_hot_paths --output new.json --compare-with old.json
+"""
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from itertools import product
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import click
+import yaml
+
+from cli.access_mangement.access_management_config_file_parser import (
+    parse_access_management_config,
+)
+from cli.access_mangement.access_management_rows_generator import (
+    generate_access_management_row_records,
+)
+from cli.access_mangement.configure_access_management_macro_properties_provider import (
+    ACCESS_MANAGEMENT_CONFIG_TABLE_COLUMNS,
+    _build_access_management_row_value_sql,
+    _build_create_access_management_config_table_sql,
+)
+from cli.data_masking.configure_data_masking_macro_properties_provider import (
+    _build_create_data_masking_config_table_sql,
+)
+from cli.data_masking.data_masking_config_file_parser import parse_data_masking_config
+from cli.data_masking.data_masking_rows_generator import (
+    generate_data_masking_row_records,
+)
+from cli.sql_utils import build_insert_statements_sql
+from cli.synthetic.synthetic_project_generator import (
+    SyntheticProjectConfig,
+    generate_manifest_nodes,
+    generate_access_management_config,
+    generate_data_masking_config,
+)
+
+NODES_COUNTS = (1000, 10000, 50000)
+IDENTITIES_COUNTS = (10, 200, 2000)
+FOLDER_TREES = {
+    "shallow": {"folder_depth": 1, "folders_per_level": 10},
+    "deep": {"folder_depth": 6, "folders_per_level": 3},
+}
+INSERT_BATCH_MAX_ROWS_VALUES = (1000, 10000, 100000)
+INSERT_BATCH_MAX_BYTES_VALUES = (256 * 1024, 1024 * 1024, 4 * 1024 * 1024)
+CURRENT_TIMESTAMP = "2024-01-01 00:00:00"
+# Shorter measurements are dominated by noise and are not compared between runs
+MIN_COMPARED_WALL_TIME_SECONDS = 0.05
+
+
+def _measure(
+    function: Callable[[], Any], measure_memory: bool
+) -> Tuple[Any, Dict[str, Optional[float]]]:
+    gc.collect()
+    start_time = time.perf_counter()
+    result = function()
+    wall_time_seconds = time.perf_counter() - start_time
+
+    peak_memory_bytes = None
+    if measure_memory:
+        del result
+        gc.collect()
+        # tracemalloc slows allocations down, so memory is measured in a separate call
+        tracemalloc.start()
+        try:
+            result = function()
+            peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result, {
+        "wall_time_seconds": round(wall_time_seconds, 6),
+        "peak_memory_bytes": peak_memory_bytes,
+    }
+
+
+def _write_yaml(content: Dict[str, Any], file_path: str) -> None:
+    with open(file_path, "w") as file:
+        yaml.safe_dump(content, file)
+
+
+def _measure_insert_statements(
+    values: List[str],
+    insert_batch_max_rows_values: List[int],
+    insert_batch_max_bytes_values: List[int],
+    functions: Dict[str, Dict[str, Optional[float]]],
+    measure_memory: bool,
+) -> Dict[str, int]:
+    insert_statements_counts = {}
+    for insert_batch_max_rows, insert_batch_max_bytes in product(
+        insert_batch_max_rows_values, insert_batch_max_bytes_values
+    ):
+        insert_batch = (
+            f"max_rows={insert_batch_max_rows},max_bytes={insert_batch_max_bytes}"
+        )
+        (
+            insert_statements_sql,
+            functions[f"build_insert_statements_sql[{insert_batch}]"],
+        ) = _measure(
+            lambda: build_insert_statements_sql(
+                "benchmark_table",
+                ACCESS_MANAGEMENT_CONFIG_TABLE_COLUMNS,
+                values,
+                insert_batch_max_rows,
+                insert_batch_max_bytes,
+            ),
+            measure_memory,
+        )
+        insert_statements_counts[
+            f"insert_statements[{insert_batch}]"
+        ] = insert_statements_sql.count("INSERT INTO")
+        del insert_statements_sql
+    return insert_statements_counts
+
+
+def run_scenario(
+    config: SyntheticProjectConfig,
+    working_dir: str,
+    measure_memory: bool,
+    insert_batch_max_rows_values: List[int] = INSERT_BATCH_MAX_ROWS_VALUES,
+    insert_batch_max_bytes_values: List[int] = INSERT_BATCH_MAX_BYTES_VALUES,
+) -> Dict[str, Any]:
+    manifest_nodes = generate_manifest_nodes(config)
+    access_management_config_path = os.path.join(working_dir, "access_management.yml")
+    data_masking_config_path = os.path.join(working_dir, "data_masking.yml")
+    _write_yaml(
+        generate_access_management_config(config), access_management_config_path
+    )
+    _write_yaml(generate_data_masking_config(config), data_masking_config_path)
+
+    functions = {}
+    access_management_config, functions["parse_access_management_config"] = _measure(
+        lambda: parse_access_management_config(access_management_config_path),
+        measure_memory,
+    )
+    database_access_config = access_management_config.databases_access_config[0]
+    (
+        access_management_rows,
+        functions["generate_access_management_row_records"],
+    ) = _measure(
+        lambda: generate_access_management_row_records(
+            database_access_config, manifest_nodes, config.project_name, "redshift"
+        ),
+        measure_memory,
+    )
+    (
+        access_management_sql,
+        functions["build_create_access_management_config_table_sql"],
+    ) = _measure(
+        lambda: _build_create_access_management_config_table_sql(
+            access_management_rows, "benchmark_table", CURRENT_TIMESTAMP
+        ),
+        measure_memory,
+    )
+    insert_statements_counts = _measure_insert_statements(
+        [
+            _build_access_management_row_value_sql(row, CURRENT_TIMESTAMP)
+            for row in access_management_rows
+        ],
+        insert_batch_max_rows_values,
+        insert_batch_max_bytes_values,
+        functions,
+        measure_memory,
+    )
+    data_masking_config, functions["parse_data_masking_config"] = _measure(
+        lambda: parse_data_masking_config(data_masking_config_path), measure_memory
+    )
+    data_masking_rows, functions["generate_data_masking_row_records"] = _measure(
+        lambda: generate_data_masking_row_records(data_masking_config, manifest_nodes),
+        measure_memory,
+    )
+    (
+        data_masking_sql,
+        functions["build_create_data_masking_config_table_sql"],
+    ) = _measure(
+        lambda: _build_create_data_masking_config_table_sql(
+            data_masking_rows,
+            "benchmark_table",
+            config.project_name,
+            CURRENT_TIMESTAMP,
+        ),
+        measure_memory,
+    )
+
+    return {
+        "functions": functions,
+        "counts": {
+            "nodes": len(manifest_nodes),
+            "identities": len(database_access_config.access_config_identities),
+            "access_management_rows": len(access_management_rows),
+            "grants": sum(len(row.grants) for row in access_management_rows),
+            "revokes": sum(len(row.revokes) for row in access_management_rows),
+            "access_management_sql_bytes": len(access_management_sql),
+            "data_masking_rows": len(data_masking_rows),
+            "data_masking_sql_bytes": len(data_masking_sql),
+            **insert_statements_counts,
+        },
+    }
+
+
+def _get_scenarios(
+    nodes_counts: List[int], identities_counts: List[int], folder_trees: List[str]
+) -> List[Tuple[str, SyntheticProjectConfig]]:
+    scenarios = []
+    for nodes, identities, folder_tree in product(
+        nodes_counts, identities_counts, folder_trees
+    ):
+        roles = identities // 5
+        scenarios.append(
+            (
+                f"nodes={nodes},identities={identities},folders={folder_tree}",
+                SyntheticProjectConfig(
+                    models=nodes,
+                    users=identities - roles,
+                    roles=roles,
+                    masked_columns_per_model=2,
+                    **FOLDER_TREES[folder_tree],
+                ),
+            )
+        )
+    return scenarios
+
+
+def _compare_results(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    regressions = []
+    for scenario_name, scenario in results["scenarios"].items():
+        baseline_scenario = baseline["scenarios"].get(scenario_name)
+        if not baseline_scenario or "functions" not in baseline_scenario:
+            continue
+        for function_name, measurement in scenario.get("functions", {}).items():
+            baseline_measurement = baseline_scenario["functions"].get(function_name)
+            if not baseline_measurement:
+                continue
+            for metric in ("wall_time_seconds", "peak_memory_bytes"):
+                value = measurement[metric]
+                baseline_value = baseline_measurement[metric]
+                if not value or not baseline_value:
+                    continue
+                if (
+                    metric == "wall_time_seconds"
+                    and baseline_value < MIN_COMPARED_WALL_TIME_SECONDS
+                ):
+                    continue
+                ratio = value / baseline_value
+                click.echo(f"{scenario_name} {function_name} {metric}: {ratio:.2f}x")
+                if ratio > threshold:
+                    regressions.append(f"{scenario_name} {function_name} {metric}")
+    return regressions
+
+
+@click.command()
+@click.option("--output", type=str, default="benchmark_results.json")
+@click.option("--nodes", type=int, multiple=True, default=NODES_COUNTS)
+@click.option("--identities", type=int, multiple=True, default=IDENTITIES_COUNTS)
+@click.option(
+    "--folder-tree",
+    type=click.Choice(list(FOLDER_TREES)),
+    multiple=True,
+    default=list(FOLDER_TREES),
+)
+@click.option(
+    "--max-rows",
+    help="Scenarios with more access management rows (nodes * identities) are skipped",
+    type=int,
+    default=1_000_000,
+)
+@click.option(
+    "--insert-batch-max-rows",
+    help="Values of --insert-batch-max-rows for which INSERT statements are built",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=INSERT_BATCH_MAX_ROWS_VALUES,
+)
+@click.option(
+    "--insert-batch-max-bytes",
+    help="Values of --insert-batch-max-bytes for which INSERT statements are built",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=INSERT_BATCH_MAX_BYTES_VALUES,
+)
+@click.option("--measure-memory", type=bool, default=True)
+@click.option(
+    "--compare-with", help="Results of a previous run to compare with", type=str
+)
+@click.option(
+    "--regression-threshold",
+    help="Ratio to the previous run above which a measurement is reported as regression",
+    type=float,
+    default=1.2,
+)
+def main(
+    output: str,
+    nodes: Tuple[int],
+    identities: Tuple[int],
+    folder_tree: Tuple[str],
+    max_rows: int,
+    insert_batch_max_rows: Tuple[int],
+    insert_batch_max_bytes: Tuple[int],
+    measure_memory: bool,
+    compare_with: Optional[str],
+    regression_threshold: float,
+):
+    results = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory() as working_dir:
+        for scenario_name, config in _get_scenarios(
+            list(nodes), list(identities), list(folder_tree)
+        ):
+            rows = config.models * (config.users + config.roles)
+            if rows > max_rows:
+                click.echo(f"Skipping {scenario_name}: {rows} rows > --max-rows")
+                results["scenarios"][scenario_name] = {"skipped": True}
+                continue
+            click.echo(f"Running {scenario_name}...")
+            results["scenarios"][scenario_name] = run_scenario(
+                config,
+                working_dir,
+                measure_memory,
+                list(insert_batch_max_rows),
+                list(insert_batch_max_bytes),
+            )
+
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    click.echo(f"Results written to {output}")
+
+    if compare_with:
+        with open(compare_with) as file:
+            baseline = json.load(file)
+        regressions = _compare_results(results, baseline, regression_threshold)
+        if regressions:
+            click.echo("Regressions:\n" + "\n".join(regressions), err=True)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Microbenchmark of grant and revoke statements rendering.
+
+Compares rendering statements of access management rows with the implementation
+used before statement templates were introduced, copied below, and with templates
+memoized per (identity, access level) used by the row records.
+
+Usage:
+    python -m benchmarks.benchmark_statement_rendering --nodes 10000 --identities 200
+"""
+import os
+import statistics
+import tempfile
+import timeit
+from typing import List, Set
+
+import click
+import yaml
+
+from cli.access_mangement.access_management_config_file_parser import (
+    AccessConfigIdentity,
+    AccessLevel,
+    IdentityType,
+    parse_access_management_config,
+)
+from cli.access_mangement.access_management_rows_generator import (
+    AccessManagementRowRecord,
+    generate_access_management_row_records,
+)
+from cli.model import ManifestNode
+from cli.synthetic.synthetic_project_generator import (
+    SyntheticProjectConfig,
+    generate_access_management_config,
+    generate_manifest_nodes,
+)
+
+
+# Implementation used before statement templates were introduced
+
+
+def _get_identity_name_with_keyword_for_identity_type(
+    identity: AccessConfigIdentity,
+) -> str:
+    if identity.identity_type == IdentityType.ROLE:
+        return f'ROLE \\"{identity.identity_name}\\"'
+    elif identity.identity_type == IdentityType.GROUP:
+        return f'GROUP \\"{identity.identity_name}\\"'
+    else:
+        return f'\\"{identity.identity_name}\\"'
+
+
+def _get_grant_statements(
+    access_level: AccessLevel, entity: AccessConfigIdentity, node: ManifestNode
+) -> Set[str]:
+    grants = set()
+    identity_name_with_keyword = _get_identity_name_with_keyword_for_identity_type(
+        entity
+    )
+
+    grants.add(
+        f"GRANT USAGE ON SCHEMA {node.schema_name} TO {identity_name_with_keyword};"
+    )
+    if access_level == AccessLevel.READ:
+        grants.add(
+            f"GRANT SELECT ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
+        )
+    if access_level == AccessLevel.WRITE:
+        grants.add(
+            f"GRANT INSERT ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
+        )
+        grants.add(
+            f"GRANT UPDATE ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
+        )
+    if access_level == AccessLevel.READ_WRITE:
+        grants.add(
+            f"GRANT SELECT ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
+        )
+        grants.add(
+            f"GRANT INSERT ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
+        )
+        grants.add(
+            f"GRANT UPDATE ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
+        )
+    if access_level == AccessLevel.ALL:
+        grants.add(
+            f"GRANT ALL ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
+        )
+
+    return grants
+
+
+def _get_revoke_statements(
+    access_level: AccessLevel,
+    entity: AccessConfigIdentity,
+    node: ManifestNode,
+) -> Set[str]:
+    revokes = set()
+    identity_name_with_keyword = _get_identity_name_with_keyword_for_identity_type(
+        entity
+    )
+
+    if access_level == AccessLevel.READ:
+        revokes.add(
+            f"REVOKE SELECT ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
+        )
+    if access_level == AccessLevel.WRITE:
+        revokes.add(
+            f"REVOKE INSERT ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
+        )
+        revokes.add(
+            f"REVOKE UPDATE ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
+        )
+    if access_level == AccessLevel.READ_WRITE:
+        revokes.add(
+            f"REVOKE SELECT ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
+        )
+        revokes.add(
+            f"REVOKE INSERT ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
+        )
+        revokes.add(
+            f"REVOKE UPDATE ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
+        )
+    if access_level == AccessLevel.ALL:
+        revokes.add(
+            f"REVOKE ALL ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
+        )
+
+    return revokes
+
+
+def _render_before_templates(rows: List[AccessManagementRowRecord]) -> int:
+    statements = 0
+    for row in rows:
+        if row.access_level is None:
+            continue
+        statements += len(
+            _get_grant_statements(row.access_level, row.identity, row.node)
+        ) + len(_get_revoke_statements(row.access_level, row.identity, row.node))
+    return statements
+
+
+def _render_memoized(rows: List[AccessManagementRowRecord]) -> int:
+    statements = 0
+    for row in rows:
+        statements += len(row.grants) + len(row.revokes)
+    return statements
+
+
+def _generate_rows(
+    config: SyntheticProjectConfig, working_dir: str
+) -> List[AccessManagementRowRecord]:
+    config_file_path = os.path.join(working_dir, "access_management.yml")
+    with open(config_file_path, "w") as file:
+        yaml.safe_dump(generate_access_management_config(config), file)
+    database_access_config = parse_access_management_config(
+        config_file_path
+    ).databases_access_config[0]
+    return generate_access_management_row_records(
+        database_access_config,
+        generate_manifest_nodes(config),
+        config.project_name,
+        "redshift",
+    )
+
+
+@click.command()
+@click.option("--nodes", type=int, default=10000)
+@click.option("--identities", type=int, default=200)
+@click.option(
+    "--repeat",
+    help="Number of measured renderings of all rows, after one warmup rendering",
+    type=click.IntRange(min=1),
+    default=5,
+)
+def main(nodes: int, identities: int, repeat: int):
+    roles = identities // 5
+    config = SyntheticProjectConfig(models=nodes, users=identities - roles, roles=roles)
+    with tempfile.TemporaryDirectory() as working_dir:
+        rows = _generate_rows(config, working_dir)
+
+    before_templates_statements = _render_before_templates(rows)
+    memoized_statements = _render_memoized(rows)
+    assert before_templates_statements == memoized_statements
+
+    timings = {}
+    for name, function in (
+        ("before templates", _render_before_templates),
+        ("memoized", _render_memoized),
+    ):
+        timings[name] = timeit.Timer(lambda: function(rows)).repeat(
+            repeat=repeat, number=1
+        )
+
+    click.echo(f"Rendered {memoized_statements} statements of {len(rows)} rows")
+    for name, seconds in timings.items():
+        click.echo(
+            f"{name}: min {min(seconds):.3f} s, median {statistics.median(seconds):.3f} s"
+        )
+    click.echo(
+        "speedup (min): "
+        f"{min(timings['before templates']) / min(timings['memoized']):.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from typing import List, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 from pydantic import BaseModel
 
@@ -24,65 +24,213 @@ class AccessManagementRow(BaseModel):
     revokes: Set[str] = {}
 
 
-def generate_access_management_rows(
+class AccessManagementRowRecord:
+    """Compact, validation-free counterpart of `AccessManagementRow`.
+
+    Records reference the node and identity objects shared by all rows,
+    grant and revoke statements are rendered only when they are read.
+    """
+
+    __slots__ = (
+        "project_name",
+        "node",
+        "identity",
+        "access_level",
+        "statement_templates",
+    )
+
+    def __init__(
+        self,
+        project_name: str,
+        node: ManifestNode,
+        identity: AccessConfigIdentity,
+        access_level: Optional[AccessLevel],
+        statement_templates: Optional["_StatementTemplates"] = None,
+    ):
+        self.project_name = project_name
+        self.node = node
+        self.identity = identity
+        self.access_level = access_level
+        if statement_templates is None and access_level is not None:
+            statement_templates = _StatementTemplates(access_level, identity)
+        self.statement_templates = statement_templates
+
+    @property
+    def database_name(self) -> str:
+        return self.node.database_name
+
+    @property
+    def schema_name(self) -> str:
+        return self.node.schema_name
+
+    @property
+    def model_name(self) -> str:
+        return self.node.model_name
+
+    @property
+    def materialization(self) -> str:
+        return self.node.materialization
+
+    @property
+    def identity_type(self) -> IdentityType:
+        return self.identity.identity_type
+
+    @property
+    def identity_name(self) -> str:
+        return self.identity.identity_name
+
+    @property
+    def grants(self) -> Set[str]:
+        if self.statement_templates is None:
+            return set()
+        return self.statement_templates.get_grant_statements(self.node)
+
+    @property
+    def revokes(self) -> Set[str]:
+        if self.statement_templates is None:
+            return set()
+        return self.statement_templates.get_revoke_statements(self.node)
+
+    def to_row(self) -> AccessManagementRow:
+        return AccessManagementRow(
+            project_name=self.project_name,
+            database_name=self.database_name,
+            schema_name=self.schema_name,
+            model_name=self.model_name,
+            materialization=self.materialization,
+            identity_type=self.identity_type,
+            identity_name=self.identity_name,
+            grants=self.grants,
+            revokes=self.revokes,
+        )
+
+
+class _ConfigPathsTrie:
+    """Character trie of config paths of all identities.
+
+    Walking a node path down the trie visits every config path which is a prefix
+    of it, so the most specific access level of each identity is resolved in a single pass.
+    """
+
+    _MATCHES = None
+
+    def __init__(self, identities: List[AccessConfigIdentity]):
+        self._root = {}
+        for identity_index, identity in enumerate(identities):
+            for path_index, (path, access_level) in enumerate(identity.config_paths):
+                trie_node = self._root
+                for character in path:
+                    trie_node = trie_node.setdefault(character, {})
+                trie_node.setdefault(self._MATCHES, []).append(
+                    (identity_index, (path.count("/"), -path_index), access_level)
+                )
+
+    def get_access_levels(self, node_path: str) -> Dict[int, AccessLevel]:
+        best_matches: Dict[int, Tuple[Tuple[int, int], AccessLevel]] = {}
+        trie_node = self._root
+        self._collect_matches(trie_node, best_matches)
+        for character in node_path:
+            trie_node = trie_node.get(character)
+            if trie_node is None:
+                break
+            self._collect_matches(trie_node, best_matches)
+        return {
+            identity_index: access_level
+            for identity_index, (_, access_level) in best_matches.items()
+        }
+
+    def _collect_matches(
+        self,
+        trie_node: Dict,
+        best_matches: Dict[int, Tuple[Tuple[int, int], AccessLevel]],
+    ) -> None:
+        # The most specific path wins, on a tie the path configured first
+        for identity_index, specificity, access_level in trie_node.get(
+            self._MATCHES, []
+        ):
+            best_match = best_matches.get(identity_index)
+            if best_match is None or specificity > best_match[0]:
+                best_matches[identity_index] = (specificity, access_level)
+
+
+def _get_node_config_path(node: ManifestNode) -> Optional[str]:
+    if node.model_type == ModelType.MODEL or node.model_type == ModelType.SNAPSHOT:
+        return f"/{node.path.replace('.sql', '/')}"
+    if node.model_type == ModelType.SEED:
+        return f"/{node.path.replace('.csv', '/')}"
+    return None
+
+
+def generate_access_management_row_records(
     data_base_access_config: DataBaseAccessConfig,
     manifest_nodes: List[ManifestNode],
     project_name: str,
     sql_engine: str,
-) -> List[AccessManagementRow]:
+    skip_rows_without_grants: bool = False,
+) -> List[AccessManagementRowRecord]:
     if sql_engine not in SUPPORTED_SQL_ENGINES:
         raise Exception(
             f"Currently supported sql engines are: {', '.join(SUPPORTED_SQL_ENGINES)}"
         )
-    access_management_rows = []
+    access_management_row_records = []
+    identities = data_base_access_config.access_config_identities
+    config_paths_trie = _ConfigPathsTrie(identities)
+    statement_templates: Dict[Tuple[int, AccessLevel], _StatementTemplates] = {}
 
     for node in manifest_nodes:
-        for identity in data_base_access_config.access_config_identities:
-            grants_per_node = set()
-            revokes_per_node = set()
+        node_config_path = _get_node_config_path(node)
+        access_levels = (
+            config_paths_trie.get_access_levels(node_config_path)
+            if node_config_path is not None
+            else {}
+        )
 
-            sorted_config_paths = sorted(
-                identity.config_paths, key=lambda x: x[0].count("/"), reverse=True
+        for identity_index, identity in enumerate(identities):
+            access_level = access_levels.get(identity_index)
+            if access_level is None and skip_rows_without_grants:
+                continue
+            identity_statement_templates = None
+            if access_level is not None:
+                identity_statement_templates = statement_templates.get(
+                    (identity_index, access_level)
+                )
+                if identity_statement_templates is None:
+                    identity_statement_templates = _StatementTemplates(
+                        access_level, identity
+                    )
+                    statement_templates[
+                        (identity_index, access_level)
+                    ] = identity_statement_templates
+            access_management_row_records.append(
+                AccessManagementRowRecord(
+                    project_name,
+                    node,
+                    identity,
+                    access_level,
+                    identity_statement_templates,
+                )
             )
 
-            for path, access_level in sorted_config_paths:
-                if (
-                    node.model_type == ModelType.MODEL
-                    or node.model_type == ModelType.SNAPSHOT
-                ):
-                    if f"/{node.path.replace('.sql', '/')}".startswith(path):
-                        grants_per_node = _get_grant_statements(
-                            access_level, identity, node
-                        )
-                        revokes_per_node = _get_revoke_statements(
-                            access_level, identity, node
-                        )
-                        break
-
-                if node.model_type == ModelType.SEED:
-                    if f"/{node.path.replace('.csv', '/')}".startswith(path):
-                        grants_per_node = _get_grant_statements(
-                            access_level, identity, node
-                        )
-                        revokes_per_node = _get_revoke_statements(
-                            access_level, identity, node
-                        )
-                        break
-
-            access_management_row = AccessManagementRow(
-                project_name=project_name,
-                database_name=node.database_name,
-                schema_name=node.schema_name,
-                model_name=node.model_name,
-                materialization=node.materialization,
-                identity_type=identity.identity_type,
-                identity_name=identity.identity_name,
-                grants=grants_per_node,
-                revokes=revokes_per_node,
-            )
-            access_management_rows.append(access_management_row)
+    return access_management_row_records
 
-    return access_management_rows
+
+def generate_access_management_rows(
+    data_base_access_config: DataBaseAccessConfig,
+    manifest_nodes: List[ManifestNode],
+    project_name: str,
+    sql_engine: str,
+    skip_rows_without_grants: bool = False,
+) -> List[AccessManagementRow]:
+    return [
+        access_management_row_record.to_row()
+        for access_management_row_record in generate_access_management_row_records(
+            data_base_access_config,
+            manifest_nodes,
+            project_name,
+            sql_engine,
+            skip_rows_without_grants,
+        )
+    ]
 
 
 def _get_identity_name_with_keyword_for_identity_type(
@@ -96,80 +244,52 @@ def _get_identity_name_with_keyword_for_identity_type(
         return f'\\"{identity.identity_name}\\"'
 
 
-def _get_grant_statements(
-    access_level: AccessLevel, entity: AccessConfigIdentity, node: ManifestNode
-) -> Set[str]:
-    grants = set()
-    identity_name_with_keyword = _get_identity_name_with_keyword_for_identity_type(
-        entity
-    )
-
-    grants.add(
-        f"GRANT USAGE ON SCHEMA {node.schema_name} TO {identity_name_with_keyword};"
-    )
-    if access_level == AccessLevel.READ:
-        grants.add(
-            f"GRANT SELECT ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
-        )
-    if access_level == AccessLevel.WRITE:
-        grants.add(
-            f"GRANT INSERT ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
-        )
-        grants.add(
-            f"GRANT UPDATE ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
-        )
-    if access_level == AccessLevel.READ_WRITE:
-        grants.add(
-            f"GRANT SELECT ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
-        )
-        grants.add(
-            f"GRANT INSERT ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
-        )
-        grants.add(
-            f"GRANT UPDATE ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
-        )
-    if access_level == AccessLevel.ALL:
-        grants.add(
-            f"GRANT ALL ON {node.schema_name}.{node.model_name} TO {identity_name_with_keyword};"
-        )
-
-    return grants
+class _StatementTemplates:
+    """Grant and revoke statements of one identity with one access level.
 
+    The identity keyword and privileges are rendered once, per node only the
+    object name is filled in. USAGE grants are cached per schema.
+    """
 
-def _get_revoke_statements(
-    access_level: AccessLevel,
-    entity: AccessConfigIdentity,
-    node: ManifestNode,
-) -> Set[str]:
-    revokes = set()
-    identity_name_with_keyword = _get_identity_name_with_keyword_for_identity_type(
-        entity
-    )
+    _PRIVILEGES = {
+        AccessLevel.READ: ("SELECT",),
+        AccessLevel.WRITE: ("INSERT", "UPDATE"),
+        AccessLevel.READ_WRITE: ("SELECT", "INSERT", "UPDATE"),
+        AccessLevel.ALL: ("ALL",),
+    }
 
-    if access_level == AccessLevel.READ:
-        revokes.add(
-            f"REVOKE SELECT ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
-        )
-    if access_level == AccessLevel.WRITE:
-        revokes.add(
-            f"REVOKE INSERT ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
-        )
-        revokes.add(
-            f"REVOKE UPDATE ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
-        )
-    if access_level == AccessLevel.READ_WRITE:
-        revokes.add(
-            f"REVOKE SELECT ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
-        )
-        revokes.add(
-            f"REVOKE INSERT ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
-        )
-        revokes.add(
-            f"REVOKE UPDATE ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
-        )
-    if access_level == AccessLevel.ALL:
-        revokes.add(
-            f"REVOKE ALL ON {node.schema_name}.{node.model_name} FROM {identity_name_with_keyword};"
+    def __init__(self, access_level: AccessLevel, identity: AccessConfigIdentity):
+        identity_name_with_keyword = _get_identity_name_with_keyword_for_identity_type(
+            identity
         )
+        privileges = self._PRIVILEGES.get(access_level, ())
+        self._grant_templates = [
+            (f"GRANT {privilege} ON ", f" TO {identity_name_with_keyword};")
+            for privilege in privileges
+        ]
+        self._revoke_templates = [
+            (f"REVOKE {privilege} ON ", f" FROM {identity_name_with_keyword};")
+            for privilege in privileges
+        ]
+        self._usage_grant_suffix = f" TO {identity_name_with_keyword};"
+        self._usage_grants: Dict[str, str] = {}
+
+    def get_grant_statements(self, node: ManifestNode) -> Set[str]:
+        usage_grant = self._usage_grants.get(node.schema_name)
+        if usage_grant is None:
+            usage_grant = (
+                f"GRANT USAGE ON SCHEMA {node.schema_name}{self._usage_grant_suffix}"
+            )
+            self._usage_grants[node.schema_name] = usage_grant
+        object_name = f"{node.schema_name}.{node.model_name}"
+        grants = {
+            prefix + object_name + suffix for prefix, suffix in self._grant_templates
+        }
+        grants.add(usage_grant)
+        return grants
 
-    return revokes
+    def get_revoke_statements(self, node: ManifestNode) -> Set[str]:
+        object_name = f"{node.schema_name}.{node.model_name}"
+        return {
+            prefix + object_name + suffix for prefix, suffix in self._revoke_templates
+        }
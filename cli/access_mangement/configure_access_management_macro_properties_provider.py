@@ -1,43 +1,87 @@
 import json
 import time
 from datetime import datetime
-from typing import List
+from typing import Callable, Iterable, List, Optional, Tuple
 
 from cli.access_mangement.access_management_config_file_parser import (
     parse_access_management_config,
     AccessManagementConfig,
+    DataBaseAccessConfig,
 )
 from cli.access_mangement.access_management_rows_generator import (
-    generate_access_management_rows,
-    AccessManagementRow,
+    generate_access_management_row_records,
+    AccessManagementRowRecord,
 )
 
+from cli.config_snapshot import (
+    ConfigTableDeltaCollector,
+    ConfigTableSnapshot,
+    ConfigTableStateHash,
+    collect_row_entries,
+    get_row_key,
+    iterate_row_values_sql,
+    load_config_table_snapshot,
+    split_row_key,
+)
+from cli.constants import ACCESS_MANAGEMENT_SNAPSHOT_PATH
 from cli.exceptions import (
     DatabaseAccessManagementConfigNotExistsException,
 )
-from cli.model import ConfigureMacroProperties, ManifestNode
+from cli.model import (
+    ConfigureMacroProperties,
+    ManifestNode,
+    InsertBatchConfig,
+    TableLayoutConfig,
+)
+from cli.process_pool import map_in_shards
+from cli.profiler import profiler
+from cli.sql_utils import (
+    build_insert_statements_sql,
+    build_replace_table_rows_sql,
+    build_table_layout_sql,
+    build_copy_rows_except_keys_sql,
+    build_row_value_sql,
+)
 
 
-def _get_access_management_rows(
-    manifest_nodes: List[ManifestNode],
-    access_management_config: AccessManagementConfig,
-    project_name: str,
-    sql_engine: str,
-    database_name: str = None,
-) -> List[AccessManagementRow]:
+def _get_database_access_config(
+    access_management_config: AccessManagementConfig, database_name: str = None
+) -> DataBaseAccessConfig:
     for database_access_config in access_management_config.databases_access_config:
         if database_access_config.database_name == database_name:
-            return generate_access_management_rows(
-                database_access_config, manifest_nodes, project_name, sql_engine
+            profiler.add_count(
+                "identities", len(database_access_config.access_config_identities)
             )
+            return database_access_config
     raise DatabaseAccessManagementConfigNotExistsException(database_name)
 
 
-def _build_create_access_management_config_table_sql(
-    rows: List[AccessManagementRow], table_name: str
+ACCESS_MANAGEMENT_CONFIG_TABLE_ROW_COLUMNS = (
+    "project_name, database_name, schema_name, model_name, materialization, "
+    "identity_type, identity_name, grants, revokes"
+)
+ACCESS_MANAGEMENT_CONFIG_TABLE_COLUMNS = (
+    f"{ACCESS_MANAGEMENT_CONFIG_TABLE_ROW_COLUMNS}, created_timestamp"
+)
+ACCESS_MANAGEMENT_CONFIG_TABLE_KEY_COLUMNS = (
+    "database_name, schema_name, model_name, identity_type, identity_name"
+)
+# Post-hooks look rows up by model and identity
+ACCESS_MANAGEMENT_CONFIG_TABLE_SORT_KEY_COLUMNS = (
+    "schema_name, model_name, identity_type, identity_name"
+)
+
+
+def _build_create_access_management_config_table_if_not_exists_sql(
+    table_name: str, table_layout_config: TableLayoutConfig = TableLayoutConfig()
 ) -> str:
-    current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    create_table_sql = f"""
+    table_layout_sql = build_table_layout_sql(
+        table_layout_config.dist_style.value,
+        ACCESS_MANAGEMENT_CONFIG_TABLE_SORT_KEY_COLUMNS
+        if table_layout_config.sort_key
+        else None,
+    )
+    return f"""
 BEGIN;
 CREATE SCHEMA IF NOT EXISTS access_management;
 CREATE TABLE IF NOT EXISTS access_management.{table_name} (
@@ -51,38 +95,155 @@ CREATE TABLE IF NOT EXISTS access_management.{table_name} (
         grants SUPER,
         revokes SUPER,
         created_timestamp TIMESTAMP
-    );
+    ){table_layout_sql};
     """
-    if rows:
-        create_table_sql += f"""
-        INSERT INTO access_management.{table_name}
-        (project_name, database_name, schema_name, model_name, materialization, identity_type, identity_name, grants, revokes, created_timestamp)
-        VALUES
-        """
-
-        values = []
-        for row in rows:
-            grants = json.dumps(list(row.grants)).replace("'", "''")
-            revokes = json.dumps(list(row.revokes)).replace("'", "''")
-            value = (
-                f"('{row.project_name}', "
-                f"'{row.database_name}', "
-                f"'{row.schema_name}', "
-                f"'{row.model_name}', "
-                f"'{row.materialization}', "
-                f"'{row.identity_type.value}', "
-                f"'{row.identity_name}', "
-                f"'{grants}', "
-                f"'{revokes}', "
-                f"TO_TIMESTAMP('{current_timestamp}', 'YYYY-MM-DD HH24:MI:SS'))"
-            )
-            values.append(value)
 
-        create_table_sql += ",\n".join(values) + ";"
 
-    create_table_sql += (
-        f"DELETE FROM access_management.{table_name} "
-        f"WHERE created_timestamp < TO_TIMESTAMP('{current_timestamp}', 'YYYY-MM-DD HH24:MI:SS');"
+def _get_access_management_row_key(row: AccessManagementRowRecord) -> str:
+    return get_row_key(
+        row.database_name,
+        row.schema_name,
+        row.model_name,
+        row.identity_type.value,
+        row.identity_name,
+    )
+
+
+def _build_access_management_row_content_sql(row: AccessManagementRowRecord) -> str:
+    # Sets are sorted, so the rendered SQL doesn't depend on the hash seed of the process
+    grants = json.dumps(sorted(row.grants)).replace("'", "''")
+    revokes = json.dumps(sorted(row.revokes)).replace("'", "''")
+    return (
+        f"'{row.project_name}', "
+        f"'{row.database_name}', "
+        f"'{row.schema_name}', "
+        f"'{row.model_name}', "
+        f"'{row.materialization}', "
+        f"'{row.identity_type.value}', "
+        f"'{row.identity_name}', "
+        f"'{grants}', "
+        f"'{revokes}'"
+    )
+
+
+def _build_access_management_row_value_sql(
+    row: AccessManagementRowRecord, current_timestamp: str
+) -> str:
+    return build_row_value_sql(
+        _build_access_management_row_content_sql(row), current_timestamp
+    )
+
+
+def _build_access_management_row_entries(
+    manifest_nodes: List[ManifestNode],
+    database_access_config: DataBaseAccessConfig,
+    project_name: str,
+    sql_engine: str,
+    skip_rows_without_grants: bool,
+) -> List[Tuple[str, str]]:
+    return [
+        (
+            _get_access_management_row_key(row),
+            _build_access_management_row_content_sql(row),
+        )
+        for row in generate_access_management_row_records(
+            database_access_config,
+            manifest_nodes,
+            project_name,
+            sql_engine,
+            skip_rows_without_grants,
+        )
+    ]
+
+
+def _build_create_access_management_config_table_from_values_sql(
+    values: Iterable[str],
+    table_name: str,
+    insert_batch_config: InsertBatchConfig = InsertBatchConfig(),
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+) -> str:
+    create_table_sql = _build_create_access_management_config_table_if_not_exists_sql(
+        table_name, table_layout_config
+    )
+    create_table_sql += build_insert_statements_sql(
+        table_name,
+        ACCESS_MANAGEMENT_CONFIG_TABLE_COLUMNS,
+        values,
+        insert_batch_config.max_rows,
+        insert_batch_config.max_bytes,
+    )
+    create_table_sql += "\nCOMMIT;"
+
+    return create_table_sql
+
+
+def _build_create_access_management_config_table_sql(
+    rows: List[AccessManagementRowRecord],
+    table_name: str,
+    current_timestamp: str,
+    insert_batch_config: InsertBatchConfig = InsertBatchConfig(),
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+) -> str:
+    return _build_create_access_management_config_table_from_values_sql(
+        (
+            _build_access_management_row_value_sql(row, current_timestamp)
+            for row in rows
+        ),
+        table_name,
+        insert_batch_config,
+        table_layout_config,
+    )
+
+
+def _build_copy_access_management_config_table_sql(
+    source_table_name: str,
+    table_name: str,
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+) -> str:
+    create_table_sql = _build_create_access_management_config_table_if_not_exists_sql(
+        table_name, table_layout_config
+    )
+    create_table_sql += build_replace_table_rows_sql(
+        source_table_name, table_name, ACCESS_MANAGEMENT_CONFIG_TABLE_COLUMNS
+    )
+    create_table_sql += "\nCOMMIT;"
+
+    return create_table_sql
+
+
+def _build_create_incremental_access_management_config_table_sql(
+    changed_row_contents: List[str],
+    excluded_row_keys: List[str],
+    table_name: str,
+    source_table_name: str,
+    source_created_timestamp: str,
+    current_timestamp: str,
+    insert_batch_config: InsertBatchConfig = InsertBatchConfig(),
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+) -> str:
+    create_table_sql = _build_create_access_management_config_table_if_not_exists_sql(
+        table_name, table_layout_config
+    )
+    create_table_sql += build_copy_rows_except_keys_sql(
+        source_table_name,
+        table_name,
+        ACCESS_MANAGEMENT_CONFIG_TABLE_ROW_COLUMNS,
+        ACCESS_MANAGEMENT_CONFIG_TABLE_KEY_COLUMNS,
+        [split_row_key(row_key) for row_key in excluded_row_keys],
+        source_created_timestamp,
+        current_timestamp,
+        insert_batch_config.max_rows,
+        insert_batch_config.max_bytes,
+    )
+    create_table_sql += build_insert_statements_sql(
+        table_name,
+        ACCESS_MANAGEMENT_CONFIG_TABLE_COLUMNS,
+        (
+            build_row_value_sql(row_content_sql, current_timestamp)
+            for row_content_sql in changed_row_contents
+        ),
+        insert_batch_config.max_rows,
+        insert_batch_config.max_bytes,
     )
     create_table_sql += "\nCOMMIT;"
 
@@ -95,14 +256,19 @@ def get_configure_access_management_macro_properties(
     sql_engine: str,
     database_name: str,
     project_name: str,
+    skip_rows_without_grants: bool = False,
+    insert_batch_config: InsertBatchConfig = InsertBatchConfig(),
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+    workers: int = 1,
+    incremental_refresh: bool = False,
+    skip_unchanged_configuration: bool = False,
+    snapshot_path: str = ACCESS_MANAGEMENT_SNAPSHOT_PATH,
+    get_config_table_created_timestamp: Optional[Callable[[str], Optional[str]]] = None,
 ) -> ConfigureMacroProperties:
-    access_management_config = parse_access_management_config(config_file_path)
-    access_management_rows = _get_access_management_rows(
-        manifest_nodes,
-        access_management_config,
-        project_name,
-        sql_engine,
-        database_name,
+    with profiler.phase("access_management_config_parse"):
+        access_management_config = parse_access_management_config(config_file_path)
+    database_access_config = _get_database_access_config(
+        access_management_config, database_name
     )
 
     temp_access_management_config_table_name = (
@@ -110,20 +276,169 @@ def get_configure_access_management_macro_properties(
     )
     config_access_management_table_name = f"{project_name}_access_management_config"
 
-    create_temp_access_management_config_table_query = (
-        _build_create_access_management_config_table_sql(
-            access_management_rows, temp_access_management_config_table_name
+    current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    previous_snapshot = (
+        load_config_table_snapshot(
+            snapshot_path,
+            config_access_management_table_name,
+            ACCESS_MANAGEMENT_CONFIG_TABLE_COLUMNS,
         )
+        if incremental_refresh
+        else None
     )
+    if previous_snapshot is not None and (
+        get_config_table_created_timestamp is None
+        or get_config_table_created_timestamp(config_access_management_table_name)
+        != previous_snapshot.created_timestamp
+    ):
+        # Rows of the configuration table were replaced since the snapshot was written,
+        # e.g. by a configuration from another directory, so they can't be copied
+        previous_snapshot = None
+    delta_collector = (
+        ConfigTableDeltaCollector(previous_snapshot) if incremental_refresh else None
+    )
+    state_hash = (
+        ConfigTableStateHash(
+            _build_create_access_management_config_table_if_not_exists_sql(
+                config_access_management_table_name, table_layout_config
+            )
+        )
+        if skip_unchanged_configuration
+        else None
+    )
+
+    if workers > 1:
+        # Worker processes render their rows to SQL right away,
+        # so grants and revokes are not counted
+        with profiler.phase("access_management_rows_generation"):
+            access_management_row_entries = map_in_shards(
+                _build_access_management_row_entries,
+                manifest_nodes,
+                workers,
+                database_access_config,
+                project_name,
+                sql_engine,
+                skip_rows_without_grants,
+            )
+        profiler.add_count("access_management_rows", len(access_management_row_entries))
+    else:
+        with profiler.phase("access_management_rows_generation"):
+            access_management_rows = generate_access_management_row_records(
+                database_access_config,
+                manifest_nodes,
+                project_name,
+                sql_engine,
+                skip_rows_without_grants,
+            )
+        profiler.add_count("access_management_rows", len(access_management_rows))
+        if profiler.enabled:
+            # Statements of row records are rendered on access,
+            # so they are counted only when profiling
+            profiler.add_count(
+                "grants", sum(len(row.grants) for row in access_management_rows)
+            )
+            profiler.add_count(
+                "revokes", sum(len(row.revokes) for row in access_management_rows)
+            )
+        access_management_row_entries = (
+            (
+                _get_access_management_row_key(row),
+                _build_access_management_row_content_sql(row),
+            )
+            for row in access_management_rows
+        )
+
+    row_collectors = [
+        row_collector
+        for row_collector in (delta_collector, state_hash)
+        if row_collector is not None
+    ]
+    previous_config_created_timestamp = None
+    with profiler.phase("access_management_sql_build"):
+        if previous_snapshot is not None:
+            # Only the query which is run is built, so rows are collected first
+            # to check whether the incremental refresh is worth it
+            access_management_row_entries = collect_row_entries(
+                access_management_row_entries, row_collectors
+            )
+            row_collectors = []
+        if (
+            previous_snapshot is not None
+            and delta_collector.is_incremental_refresh_worth_it()
+        ):
+            profiler.add_count(
+                "access_management_changed_rows",
+                len(delta_collector.changed_row_contents),
+            )
+            create_temp_access_management_config_table_query = (
+                _build_create_incremental_access_management_config_table_sql(
+                    delta_collector.changed_row_contents,
+                    delta_collector.get_excluded_row_keys(),
+                    temp_access_management_config_table_name,
+                    config_access_management_table_name,
+                    previous_snapshot.created_timestamp,
+                    current_timestamp,
+                    insert_batch_config,
+                    table_layout_config,
+                )
+            )
+            previous_config_created_timestamp = previous_snapshot.created_timestamp
+        else:
+            create_temp_access_management_config_table_query = (
+                _build_create_access_management_config_table_from_values_sql(
+                    iterate_row_values_sql(
+                        access_management_row_entries, current_timestamp, row_collectors
+                    ),
+                    temp_access_management_config_table_name,
+                    insert_batch_config,
+                    table_layout_config,
+                )
+            )
+
+    snapshot = None
+    if delta_collector is not None:
+        snapshot = ConfigTableSnapshot(
+            table_name=config_access_management_table_name,
+            columns=ACCESS_MANAGEMENT_CONFIG_TABLE_COLUMNS,
+            # An unchanged configuration is skipped by the configure macro,
+            # so the configuration table keeps the rows of the previous snapshot
+            created_timestamp=previous_snapshot.created_timestamp
+            if state_hash is not None
+            and previous_snapshot is not None
+            and not delta_collector.has_changes()
+            else current_timestamp,
+            rows=delta_collector.rows,
+        )
+
     create_access_management_config_table_query = (
-        _build_create_access_management_config_table_sql(
-            access_management_rows, config_access_management_table_name
+        _build_copy_access_management_config_table_sql(
+            temp_access_management_config_table_name,
+            config_access_management_table_name,
+            table_layout_config,
         )
     )
 
+    if profiler.enabled:
+        profiler.add_count(
+            "sql_bytes",
+            len(create_temp_access_management_config_table_query.encode("utf-8"))
+            + len(create_access_management_config_table_query.encode("utf-8")),
+        )
+
     return ConfigureMacroProperties(
         temp_config_table_name=temp_access_management_config_table_name,
         config_table_name=config_access_management_table_name,
         create_temp_config_table_query=create_temp_access_management_config_table_query,
         create_config_table_query=create_access_management_config_table_query,
+        previous_config_created_timestamp=previous_config_created_timestamp,
+        state_hash=state_hash.hexdigest() if state_hash is not None else None,
+        snapshot=snapshot,
+        snapshot_path=snapshot_path,
+        configured_identities=[
+            {
+                "identity_type": identity.identity_type.value,
+                "identity_name": identity.identity_name,
+            }
+            for identity in database_access_config.access_config_identities
+        ],
     )
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from cli.sql_utils import build_row_value_sql
+
+# Incremental refresh is not worth it when most of the rows changed,
+# the excluded keys would make the query bigger than the full upload
+MAX_INCREMENTAL_CHANGED_ROWS_RATIO = 0.5
+ROW_KEY_SEPARATOR = "\x1f"
+
+
+class ConfigTableSnapshot(BaseModel):
+    """Digests of the rows last written to a configuration table."""
+
+    table_name: str
+    columns: str
+    created_timestamp: str
+    rows: Dict[str, str] = {}
+
+
+def get_row_key(*key_values: str) -> str:
+    return ROW_KEY_SEPARATOR.join(key_values)
+
+
+def split_row_key(row_key: str) -> Tuple[str, ...]:
+    return tuple(row_key.split(ROW_KEY_SEPARATOR))
+
+
+def get_row_digest(row_content_sql: str) -> str:
+    return hashlib.blake2b(row_content_sql.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ConfigTableDeltaCollector:
+    """Collects digests of rendered rows and rows changed since `previous_snapshot`."""
+
+    def __init__(self, previous_snapshot: Optional[ConfigTableSnapshot]):
+        self._previous_rows = previous_snapshot.rows if previous_snapshot else {}
+        self.rows: Dict[str, str] = {}
+        self.changed_row_contents: List[str] = []
+        self.changed_row_keys: List[str] = []
+
+    def add(self, row_key: str, row_content_sql: str) -> None:
+        row_digest = get_row_digest(row_content_sql)
+        self.rows[row_key] = row_digest
+        previous_row_digest = self._previous_rows.get(row_key)
+        if previous_row_digest == row_digest:
+            return
+        self.changed_row_contents.append(row_content_sql)
+        if previous_row_digest is not None:
+            self.changed_row_keys.append(row_key)
+
+    def has_changes(self) -> bool:
+        return bool(self.changed_row_contents) or len(self.rows) != len(
+            self._previous_rows
+        )
+
+    def get_excluded_row_keys(self) -> List[str]:
+        """Keys of previous rows which have to be removed or replaced."""
+        return self.changed_row_keys + [
+            row_key for row_key in self._previous_rows if row_key not in self.rows
+        ]
+
+    def is_incremental_refresh_worth_it(self) -> bool:
+        changed_rows = len(self.changed_row_contents) + len(
+            self.get_excluded_row_keys()
+        )
+        return changed_rows <= MAX_INCREMENTAL_CHANGED_ROWS_RATIO * len(self.rows)
+
+
+class ConfigTableStateHash:
+    """Hash of the definition and all rows of a configuration table,
+    independent of the order of rows.
+    """
+
+    def __init__(self, table_definition: str):
+        self._table_definition = table_definition
+        self._rows_digest_sum = 0
+        self._rows_count = 0
+
+    def add(self, row_key: str, row_content_sql: str) -> None:
+        row_digest = hashlib.blake2b(
+            row_content_sql.encode("utf-8"), digest_size=16
+        ).digest()
+        self._rows_digest_sum = (
+            self._rows_digest_sum + int.from_bytes(row_digest, "big")
+        ) % (1 << 128)
+        self._rows_count += 1
+
+    def hexdigest(self) -> str:
+        return hashlib.sha256(
+            f"{self._table_definition}\0{self._rows_count}\0{self._rows_digest_sum}".encode()
+        ).hexdigest()
+
+
+def iterate_row_values_sql(
+    row_entries: Iterable[Tuple[str, str]],
+    current_timestamp: str,
+    row_collectors: Iterable[
+        Union[ConfigTableDeltaCollector, ConfigTableStateHash]
+    ] = (),
+) -> Iterator[str]:
+    """Renders `(row key, row content)` entries to VALUES rows,
+    passing the entries to `row_collectors` on the way.
+    """
+    row_collectors = list(row_collectors)
+    for row_key, row_content_sql in row_entries:
+        for row_collector in row_collectors:
+            row_collector.add(row_key, row_content_sql)
+        yield build_row_value_sql(row_content_sql, current_timestamp)
+
+
+def collect_row_entries(
+    row_entries: Iterable[Tuple[str, str]],
+    row_collectors: Iterable[Union[ConfigTableDeltaCollector, ConfigTableStateHash]],
+) -> List[Tuple[str, str]]:
+    """Materializes `(row key, row content)` entries, passing them to `row_collectors`,
+    for queries which can be built only when all rows were collected.
+    """
+    row_collectors = list(row_collectors)
+    collected_row_entries = []
+    for row_key, row_content_sql in row_entries:
+        for row_collector in row_collectors:
+            row_collector.add(row_key, row_content_sql)
+        collected_row_entries.append((row_key, row_content_sql))
+    return collected_row_entries
+
+
+def load_config_table_snapshot(
+    snapshot_path: str, table_name: str, columns: str
+) -> Optional[ConfigTableSnapshot]:
+    """Returns the snapshot written for the same table with the same columns, if any."""
+    if not os.path.isfile(snapshot_path):
+        return None
+    with open(snapshot_path, "r") as file:
+        snapshot = ConfigTableSnapshot(**json.load(file))
+    if snapshot.table_name != table_name or snapshot.columns != columns:
+        return None
+    return snapshot
+
+
+def write_config_table_snapshot(
+    snapshot: ConfigTableSnapshot, snapshot_path: str
+) -> None:
+    os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+    with open(snapshot_path, "w") as file:
+        json.dump(snapshot.model_dump(), file)
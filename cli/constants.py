@@ -7,3 +7,22 @@ class SQLEngine(str, Enum):
 
 
 SUPPORTED_SQL_ENGINES: List[SQLEngine] = [SQLEngine.REDSHIFT]
+
+MANIFEST_PATH = "target/manifest.json"
+CACHED_MANIFEST_PATH = "target/dbt_am_manifest.json"
+MANIFEST_FINGERPRINT_PATH = "target/dbt_am_manifest_fingerprint"
+CACHED_PARSED_MANIFEST_PATH = "target/dbt_am_parsed_manifest.pickle"
+
+DEFAULT_INSERT_BATCH_MAX_ROWS = 10000
+DEFAULT_INSERT_BATCH_MAX_BYTES = 1024 * 1024
+
+PROFILE_REPORT_PATH = "target/dbt_am_profile.json"
+
+ACCESS_MANAGEMENT_SNAPSHOT_PATH = "target/dbt_am_access_management_snapshot.json"
+DATA_MASKING_SNAPSHOT_PATH = "target/dbt_am_data_masking_snapshot.json"
+
+DATA_MASKING_PLAN_PATH = "target/dbt_am_data_masking_plan.json"
+DATA_MASKING_PLAN_ENV_VAR = "DBT_AM_DATA_MASKING_PLAN"
+# Environment variables are inherited by every process spawned by dbt
+# and Linux rejects a single environment string bigger than 128 KiB
+DATA_MASKING_PLAN_MAX_ENV_VAR_BYTES = 64 * 1024
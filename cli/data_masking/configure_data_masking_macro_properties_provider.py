@@ -1,23 +1,67 @@
 import json
 import time
 from datetime import datetime
-from typing import List
+from typing import Callable, Iterable, List, Optional, Tuple
 
 from cli.data_masking.data_masking_config_file_parser import (
     parse_data_masking_config,
+    DataMaskingConfig,
 )
 from cli.data_masking.data_masking_rows_generator import (
-    generate_data_masking_rows,
-    DataMaskingRow,
+    generate_data_masking_row_records,
+    get_data_masking_plan,
+    DataMaskingRowRecord,
+)
+from cli.config_snapshot import (
+    ConfigTableDeltaCollector,
+    ConfigTableSnapshot,
+    ConfigTableStateHash,
+    collect_row_entries,
+    get_row_key,
+    iterate_row_values_sql,
+    load_config_table_snapshot,
+    split_row_key,
+)
+from cli.constants import DATA_MASKING_SNAPSHOT_PATH
+from cli.model import (
+    ConfigureMacroProperties,
+    ManifestNode,
+    InsertBatchConfig,
+    TableLayoutConfig,
+)
+from cli.process_pool import map_in_shards
+from cli.profiler import profiler
+from cli.sql_utils import (
+    build_insert_statements_sql,
+    build_replace_table_rows_sql,
+    build_table_layout_sql,
+    build_copy_rows_except_keys_sql,
+    build_row_value_sql,
 )
-from cli.model import ConfigureMacroProperties, ManifestNode
 
 
-def _build_create_data_masking_config_table_sql(
-    rows: List[DataMaskingRow], table_name: str, project_name: str
+DATA_MASKING_CONFIG_TABLE_ROW_COLUMNS = (
+    "project_name, database_name, schema_name, model_name, materialization, "
+    "masking_config"
+)
+DATA_MASKING_CONFIG_TABLE_COLUMNS = (
+    f"{DATA_MASKING_CONFIG_TABLE_ROW_COLUMNS}, created_timestamp"
+)
+DATA_MASKING_CONFIG_TABLE_KEY_COLUMNS = "database_name, schema_name, model_name"
+# Post-hooks look rows up by model
+DATA_MASKING_CONFIG_TABLE_SORT_KEY_COLUMNS = "schema_name, model_name"
+
+
+def _build_create_data_masking_config_table_if_not_exists_sql(
+    table_name: str, table_layout_config: TableLayoutConfig = TableLayoutConfig()
 ) -> str:
-    current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    create_table_sql = f"""
+    table_layout_sql = build_table_layout_sql(
+        table_layout_config.dist_style.value,
+        DATA_MASKING_CONFIG_TABLE_SORT_KEY_COLUMNS
+        if table_layout_config.sort_key
+        else None,
+    )
+    return f"""
 BEGIN;
 CREATE SCHEMA IF NOT EXISTS access_management;
 CREATE TABLE IF NOT EXISTS access_management.{table_name} (
@@ -28,34 +72,141 @@ CREATE TABLE IF NOT EXISTS access_management.{table_name} (
         materialization TEXT,
         masking_config SUPER,
         created_timestamp TIMESTAMP
-    );
+    ){table_layout_sql};
     """
 
-    if rows:
-        create_table_sql += f"""
-        INSERT INTO access_management.{table_name}
-        (project_name, database_name, schema_name, model_name, materialization, masking_config, created_timestamp)
-        VALUES
-        """
-
-        values = []
-        for row in rows:
-            masking_config = json.dumps(list(row.masking_config)).replace("'", "''")
-            value = (
-                f"('{project_name}', "
-                f"'{row.database_name}', "
-                f"'{row.schema_name}', "
-                f"'{row.model_name}', "
-                f"'{row.materialization}', "
-                f"JSON_PARSE('{masking_config}'), "
-                f"TO_TIMESTAMP('{current_timestamp}', 'YYYY-MM-DD HH24:MI:SS'))"
-            )
-            values.append(value)
 
-        create_table_sql += ",\n".join(values) + ";"
-    create_table_sql += (
-        f"DELETE FROM access_management.{table_name} "
-        f"WHERE created_timestamp < TO_TIMESTAMP('{current_timestamp}', 'YYYY-MM-DD HH24:MI:SS');"
+def _get_data_masking_row_key(row: DataMaskingRowRecord) -> str:
+    return get_row_key(row.database_name, row.schema_name, row.model_name)
+
+
+def _build_data_masking_row_content_sql(
+    row: DataMaskingRowRecord, project_name: str
+) -> str:
+    masking_config = json.dumps(list(row.masking_config)).replace("'", "''")
+    return (
+        f"'{project_name}', "
+        f"'{row.database_name}', "
+        f"'{row.schema_name}', "
+        f"'{row.model_name}', "
+        f"'{row.materialization}', "
+        f"JSON_PARSE('{masking_config}')"
+    )
+
+
+def _build_data_masking_row_value_sql(
+    row: DataMaskingRowRecord, project_name: str, current_timestamp: str
+) -> str:
+    return build_row_value_sql(
+        _build_data_masking_row_content_sql(row, project_name), current_timestamp
+    )
+
+
+def _build_data_masking_row_entries(
+    manifest_nodes: List[ManifestNode],
+    data_masking_config: DataMaskingConfig,
+    project_name: str,
+) -> List[Tuple[str, str]]:
+    return [
+        (
+            _get_data_masking_row_key(row),
+            _build_data_masking_row_content_sql(row, project_name),
+        )
+        for row in generate_data_masking_row_records(
+            data_masking_config, manifest_nodes
+        )
+    ]
+
+
+def _build_create_data_masking_config_table_from_values_sql(
+    values: Iterable[str],
+    table_name: str,
+    insert_batch_config: InsertBatchConfig = InsertBatchConfig(),
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+) -> str:
+    create_table_sql = _build_create_data_masking_config_table_if_not_exists_sql(
+        table_name, table_layout_config
+    )
+    create_table_sql += build_insert_statements_sql(
+        table_name,
+        DATA_MASKING_CONFIG_TABLE_COLUMNS,
+        values,
+        insert_batch_config.max_rows,
+        insert_batch_config.max_bytes,
+    )
+    create_table_sql += "\nCOMMIT;"
+
+    return create_table_sql
+
+
+def _build_create_data_masking_config_table_sql(
+    rows: List[DataMaskingRowRecord],
+    table_name: str,
+    project_name: str,
+    current_timestamp: str,
+    insert_batch_config: InsertBatchConfig = InsertBatchConfig(),
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+) -> str:
+    return _build_create_data_masking_config_table_from_values_sql(
+        (
+            _build_data_masking_row_value_sql(row, project_name, current_timestamp)
+            for row in rows
+        ),
+        table_name,
+        insert_batch_config,
+        table_layout_config,
+    )
+
+
+def _build_copy_data_masking_config_table_sql(
+    source_table_name: str,
+    table_name: str,
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+) -> str:
+    create_table_sql = _build_create_data_masking_config_table_if_not_exists_sql(
+        table_name, table_layout_config
+    )
+    create_table_sql += build_replace_table_rows_sql(
+        source_table_name, table_name, DATA_MASKING_CONFIG_TABLE_COLUMNS
+    )
+    create_table_sql += "\nCOMMIT;"
+
+    return create_table_sql
+
+
+def _build_create_incremental_data_masking_config_table_sql(
+    changed_row_contents: List[str],
+    excluded_row_keys: List[str],
+    table_name: str,
+    source_table_name: str,
+    source_created_timestamp: str,
+    current_timestamp: str,
+    insert_batch_config: InsertBatchConfig = InsertBatchConfig(),
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+) -> str:
+    create_table_sql = _build_create_data_masking_config_table_if_not_exists_sql(
+        table_name, table_layout_config
+    )
+    create_table_sql += build_copy_rows_except_keys_sql(
+        source_table_name,
+        table_name,
+        DATA_MASKING_CONFIG_TABLE_ROW_COLUMNS,
+        DATA_MASKING_CONFIG_TABLE_KEY_COLUMNS,
+        [split_row_key(row_key) for row_key in excluded_row_keys],
+        source_created_timestamp,
+        current_timestamp,
+        insert_batch_config.max_rows,
+        insert_batch_config.max_bytes,
+    )
+    create_table_sql += build_insert_statements_sql(
+        table_name,
+        DATA_MASKING_CONFIG_TABLE_COLUMNS,
+        (
+            build_row_value_sql(row_content_sql, current_timestamp)
+            for row_content_sql in changed_row_contents
+        ),
+        insert_batch_config.max_rows,
+        insert_batch_config.max_bytes,
     )
     create_table_sql += "\nCOMMIT;"
 
@@ -66,29 +217,160 @@ def get_configure_data_masking_macro_properties(
     manifest_nodes: List[ManifestNode],
     config_file_path: str,
     project_name: str,
+    insert_batch_config: InsertBatchConfig = InsertBatchConfig(),
+    table_layout_config: TableLayoutConfig = TableLayoutConfig(),
+    workers: int = 1,
+    incremental_refresh: bool = False,
+    skip_unchanged_configuration: bool = False,
+    snapshot_path: str = DATA_MASKING_SNAPSHOT_PATH,
+    get_config_table_created_timestamp: Optional[Callable[[str], Optional[str]]] = None,
 ) -> ConfigureMacroProperties:
-    data_masking_config = parse_data_masking_config(config_file_path)
-    data_masking_rows = generate_data_masking_rows(data_masking_config, manifest_nodes)
+    with profiler.phase("data_masking_config_parse"):
+        data_masking_config = parse_data_masking_config(config_file_path)
 
     temp_data_masking_config_table_name = (
         f"temp_{project_name}_{int(time.time())}_data_masking_config"
     )
     config_data_masking_table_name = f"{project_name}_data_masking_config"
 
-    create_temp_data_masking_config_table_query = (
-        _build_create_data_masking_config_table_sql(
-            data_masking_rows, temp_data_masking_config_table_name, project_name
+    current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    previous_snapshot = (
+        load_config_table_snapshot(
+            snapshot_path,
+            config_data_masking_table_name,
+            DATA_MASKING_CONFIG_TABLE_COLUMNS,
         )
+        if incremental_refresh
+        else None
+    )
+    if previous_snapshot is not None and (
+        get_config_table_created_timestamp is None
+        or get_config_table_created_timestamp(config_data_masking_table_name)
+        != previous_snapshot.created_timestamp
+    ):
+        # Rows of the configuration table were replaced since the snapshot was written,
+        # e.g. by a configuration from another directory, so they can't be copied
+        previous_snapshot = None
+    delta_collector = (
+        ConfigTableDeltaCollector(previous_snapshot) if incremental_refresh else None
     )
-    create_data_masking_config_table_query = (
-        _build_create_data_masking_config_table_sql(
-            data_masking_rows, config_data_masking_table_name, project_name
+    state_hash = (
+        ConfigTableStateHash(
+            _build_create_data_masking_config_table_if_not_exists_sql(
+                config_data_masking_table_name, table_layout_config
+            )
         )
+        if skip_unchanged_configuration
+        else None
     )
 
+    if workers > 1:
+        with profiler.phase("data_masking_rows_generation"):
+            data_masking_row_entries = map_in_shards(
+                _build_data_masking_row_entries,
+                manifest_nodes,
+                workers,
+                data_masking_config,
+                project_name,
+            )
+        profiler.add_count("data_masking_rows", len(data_masking_row_entries))
+    else:
+        with profiler.phase("data_masking_rows_generation"):
+            data_masking_rows = generate_data_masking_row_records(
+                data_masking_config, manifest_nodes
+            )
+        profiler.add_count("data_masking_rows", len(data_masking_rows))
+        data_masking_row_entries = (
+            (
+                _get_data_masking_row_key(row),
+                _build_data_masking_row_content_sql(row, project_name),
+            )
+            for row in data_masking_rows
+        )
+
+    row_collectors = [
+        row_collector
+        for row_collector in (delta_collector, state_hash)
+        if row_collector is not None
+    ]
+    previous_config_created_timestamp = None
+    with profiler.phase("data_masking_sql_build"):
+        if previous_snapshot is not None:
+            # Only the query which is run is built, so rows are collected first
+            # to check whether the incremental refresh is worth it
+            data_masking_row_entries = collect_row_entries(
+                data_masking_row_entries, row_collectors
+            )
+            row_collectors = []
+        if (
+            previous_snapshot is not None
+            and delta_collector.is_incremental_refresh_worth_it()
+        ):
+            profiler.add_count(
+                "data_masking_changed_rows",
+                len(delta_collector.changed_row_contents),
+            )
+            create_temp_data_masking_config_table_query = (
+                _build_create_incremental_data_masking_config_table_sql(
+                    delta_collector.changed_row_contents,
+                    delta_collector.get_excluded_row_keys(),
+                    temp_data_masking_config_table_name,
+                    config_data_masking_table_name,
+                    previous_snapshot.created_timestamp,
+                    current_timestamp,
+                    insert_batch_config,
+                    table_layout_config,
+                )
+            )
+            previous_config_created_timestamp = previous_snapshot.created_timestamp
+        else:
+            create_temp_data_masking_config_table_query = (
+                _build_create_data_masking_config_table_from_values_sql(
+                    iterate_row_values_sql(
+                        data_masking_row_entries, current_timestamp, row_collectors
+                    ),
+                    temp_data_masking_config_table_name,
+                    insert_batch_config,
+                    table_layout_config,
+                )
+            )
+
+    snapshot = None
+    if delta_collector is not None:
+        snapshot = ConfigTableSnapshot(
+            table_name=config_data_masking_table_name,
+            columns=DATA_MASKING_CONFIG_TABLE_COLUMNS,
+            # An unchanged configuration is skipped by the configure macro,
+            # so the configuration table keeps the rows of the previous snapshot
+            created_timestamp=previous_snapshot.created_timestamp
+            if state_hash is not None
+            and previous_snapshot is not None
+            and not delta_collector.has_changes()
+            else current_timestamp,
+            rows=delta_collector.rows,
+        )
+
+    create_data_masking_config_table_query = _build_copy_data_masking_config_table_sql(
+        temp_data_masking_config_table_name,
+        config_data_masking_table_name,
+        table_layout_config,
+    )
+
+    if profiler.enabled:
+        profiler.add_count(
+            "sql_bytes",
+            len(create_temp_data_masking_config_table_query.encode("utf-8"))
+            + len(create_data_masking_config_table_query.encode("utf-8")),
+        )
+
     return ConfigureMacroProperties(
         temp_config_table_name=temp_data_masking_config_table_name,
         config_table_name=config_data_masking_table_name,
         create_temp_config_table_query=create_temp_data_masking_config_table_query,
         create_config_table_query=create_data_masking_config_table_query,
+        previous_config_created_timestamp=previous_config_created_timestamp,
+        state_hash=state_hash.hexdigest() if state_hash is not None else None,
+        snapshot=snapshot,
+        snapshot_path=snapshot_path,
+        data_masking_plan=get_data_masking_plan(data_masking_config, manifest_nodes),
     )
@@ -1,9 +1,10 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from pydantic import BaseModel
 
 from cli.data_masking.data_masking_config_file_parser import (
     DataMaskingConfig,
+    ModelDataMaskingConfig,
 )
 from cli.model import ManifestNode
 
@@ -16,32 +17,95 @@ class DataMaskingRow(BaseModel):
     masking_config: List[Dict] = []
 
 
+class DataMaskingRowRecord:
+    """Compact, validation-free counterpart of `DataMaskingRow`.
+
+    Records reference the node and model masking config objects,
+    masking config dicts are built only when they are read.
+    """
+
+    __slots__ = ("node", "model_config")
+
+    def __init__(
+        self, node: ManifestNode, model_config: Optional[ModelDataMaskingConfig]
+    ):
+        self.node = node
+        self.model_config = model_config
+
+    @property
+    def database_name(self) -> str:
+        return self.node.database_name
+
+    @property
+    def schema_name(self) -> str:
+        return self.node.schema_name
+
+    @property
+    def model_name(self) -> str:
+        return self.node.model_name
+
+    @property
+    def materialization(self) -> str:
+        return self.node.materialization
+
+    @property
+    def masking_config(self) -> List[Dict]:
+        if self.model_config is None:
+            return []
+        return [
+            {
+                "column_name": column.column_name,
+                "users_with_access": column.users_with_access,
+                "roles_with_access": column.roles_with_access,
+            }
+            for column in self.model_config.column_masking_identities
+        ]
+
+    def to_row(self) -> DataMaskingRow:
+        return DataMaskingRow(
+            database_name=self.database_name,
+            schema_name=self.schema_name,
+            model_name=self.model_name,
+            materialization=self.materialization,
+            masking_config=self.masking_config,
+        )
+
+
+def generate_data_masking_row_records(
+    data_masking_config: DataMaskingConfig,
+    manifest_nodes: List[ManifestNode],
+) -> List[DataMaskingRowRecord]:
+    model_configs = {}
+    for model_config in data_masking_config.model_masking_identities:
+        model_configs.setdefault(model_config.model_name, model_config)
+
+    return [
+        DataMaskingRowRecord(node, model_configs.get(node.model_name))
+        for node in manifest_nodes
+    ]
+
+
 def generate_data_masking_rows(
     data_masking_config: DataMaskingConfig,
     manifest_nodes: List[ManifestNode],
 ) -> List[DataMaskingRow]:
-    data_masking_rows = []
-
-    for node in manifest_nodes:
-        masking_config = []
-        for model_config in data_masking_config.model_masking_identities:
-            if model_config.model_name == node.model_name:
-                for column in model_config.column_masking_identities:
-                    masking_config.append(
-                        {
-                            "column_name": column.column_name,
-                            "users_with_access": column.users_with_access,
-                            "roles_with_access": column.roles_with_access,
-                        }
-                    )
-                break
-
-        access_management_row = DataMaskingRow(
-            database_name=node.database_name,
-            schema_name=node.schema_name,
-            model_name=node.model_name,
-            materialization=node.materialization,
-            masking_config=masking_config,
+    return [
+        data_masking_row_record.to_row()
+        for data_masking_row_record in generate_data_masking_row_records(
+            data_masking_config, manifest_nodes
+        )
+    ]
+
+
+def get_data_masking_plan(
+    data_masking_config: DataMaskingConfig,
+    manifest_nodes: List[ManifestNode],
+) -> Dict[str, List[Dict]]:
+    """Masking configs of models with masked columns, keyed by `<schema_name>.<model_name>`."""
+    return {
+        f"{record.schema_name}.{record.model_name}": record.masking_config
+        for record in generate_data_masking_row_records(
+            data_masking_config, manifest_nodes
         )
-        data_masking_rows.append(access_management_row)
-    return data_masking_rows
+        if record.model_config is not None
+    }
@@ -1,32 +1,62 @@
 import json
+import multiprocessing
 import os
 import shlex
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 
 import click
 from dbt.cli.main import dbtRunner
 from dbt.contracts.graph.manifest import Manifest
 
+from cli.access_mangement.access_management_config_file_parser import AccessLevel
 from cli.access_mangement.configure_access_management_macro_properties_provider import (
     get_configure_access_management_macro_properties,
 )
-from cli.constants import SUPPORTED_SQL_ENGINES
+from cli.constants import (
+    SUPPORTED_SQL_ENGINES,
+    DEFAULT_INSERT_BATCH_MAX_ROWS,
+    DEFAULT_INSERT_BATCH_MAX_BYTES,
+    DATA_MASKING_PLAN_ENV_VAR,
+    DATA_MASKING_PLAN_MAX_ENV_VAR_BYTES,
+    DATA_MASKING_PLAN_PATH,
+)
+from cli.config_snapshot import write_config_table_snapshot
 from cli.data_masking.configure_data_masking_macro_properties_provider import (
     get_configure_data_masking_macro_properties,
 )
+from cli.manifest.manifest_loader import load_manifest, ManifestProjection
+from cli.manifest.manifest_fingerprint import (
+    get_project_fingerprint,
+    get_cached_manifest_path,
+    cache_manifest,
+    load_cached_parsed_manifest,
+    cache_parsed_manifest,
+)
 from cli.exceptions import (
     MultipleDatabaseNamesException,
     SQLEngineNotSupportedException,
 )
-from cli.model import ManifestNode, ModelType, ConfigureMacroProperties
+from cli.profiler import profiler
+from cli.synthetic.synthetic_project_generator import (
+    SyntheticProjectConfig,
+    write_synthetic_project,
+)
+from cli.model import (
+    DistStyle,
+    ManifestNode,
+    ModelType,
+    ConfigureMacroProperties,
+    InsertBatchConfig,
+    TableLayoutConfig,
+)
 
 try:
     from dbt.artifacts.resources.types import NodeType
 except ModuleNotFoundError:
     from dbt.node_types import NodeType
 
-dbt = dbtRunner()
-
 
 def _get_command_list(dbt_command: str) -> List[str]:
     return list(
@@ -57,7 +87,7 @@ def _get_target(command_list: List[str]) -> Optional[str]:
 
 
 def _get_manifest_nodes_eligible_for_configuration(
-    manifest: Manifest, project_name: str
+    manifest: Union[Manifest, ManifestProjection], project_name: str
 ) -> List[ManifestNode]:
     result = []
     for unique_id, node in manifest.nodes.items():
@@ -122,70 +152,194 @@ def _get_database_name(manifest_nodes: List[ManifestNode], database_name: str =
     return database_name if database_name else list(db_name_from_manifest_file)[0]
 
 
-def _invoke_compile_command(target: str = None, variables: str = None) -> None:
+def _get_dbt_runner(target: str = None, variables: str = None) -> dbtRunner:
+    click.echo("Parsing project...")
+    cmd = ["parse"]
+    if target:
+        cmd.extend(["--target", target])
+    if variables:
+        cmd.extend(["--vars", variables])
+    with profiler.phase("parse"):
+        res = dbtRunner().invoke(cmd)
+    if not res.success:
+        exit(1)
+    return dbtRunner(manifest=res.result)
+
+
+def _invoke_compile_command(
+    dbt: dbtRunner, target: str = None, variables: str = None
+) -> None:
     click.echo("Compiling project...")
     cmd = ["compile"]
     if target:
         cmd.extend(["--target", target])
     if variables:
         cmd.extend(["--vars", variables])
-    res = dbt.invoke(cmd)
+    with profiler.phase("compile"):
+        res = dbt.invoke(cmd)
     if not res.success:
         exit(1)
 
 
-def load_manifest(manifest_path: str = "target/manifest.json") -> Manifest:
-    with open(manifest_path, "r") as file:
-        manifest_data = json.load(file)
+def _get_config_table_created_timestamp(
+    dbt: dbtRunner, config_table_name: str, target: str = None, variables: str = None
+) -> Optional[str]:
+    cmd = [
+        "show",
+        "--inline",
+        "select '{{ dbt_access_management.get_config_table_created_timestamp(\""
+        + config_table_name
+        + '") or "" }}\' as created_timestamp',
+        "--limit",
+        "1",
+    ]
+    if target:
+        cmd.extend(["--target", target])
+    if variables:
+        cmd.extend(["--vars", variables])
+    with profiler.phase(f"config_table_created_timestamp:{config_table_name}"):
+        res = dbt.invoke(cmd)
+    if not res.success:
+        exit(1)
+    created_timestamp = res.result.results[0].agate_table.rows[0][0]
+    # agate infers a datetime from the selected string
+    if isinstance(created_timestamp, datetime):
+        created_timestamp = created_timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    return created_timestamp or None
+
+
+def _get_run_operation_command(
+    operation_name: str, args: dict, target: str = None, variables: str = None
+) -> List[str]:
+    # dbt is invoked in this process, so the args are not subject to command line size limits.
+    # Written run results would hold the args with all configuration queries
+    cmd = [
+        "run-operation",
+        operation_name,
+        "--args",
+        json.dumps(args),
+        "--no-write-json",
+    ]
+    if target:
+        cmd.extend(["--target", target])
+    if variables:
+        cmd.extend(["--vars", variables])
+    return cmd
+
 
-    return Manifest.from_dict(manifest_data)
+def _run_dbt_operation_in_subprocess(
+    manifest: Optional[Manifest], cmd: List[str]
+) -> bool:
+    return dbtRunner(manifest=manifest).invoke(cmd).success
 
 
 def run_configure_macro(
+    dbt: dbtRunner,
     configure_access_management_macro_properties: ConfigureMacroProperties = None,
     configure_data_masking_macro_properties: ConfigureMacroProperties = None,
     target: str = None,
     variables: str = None,
+    parallel: bool = False,
 ) -> None:
     def prepare_access_management_args(
         configure_properties: ConfigureMacroProperties,
     ) -> dict:
-        return {
+        args = {
             "temp_access_management_config_table_name": configure_properties.temp_config_table_name,
             "config_access_management_table_name": configure_properties.config_table_name,
             "create_temp_access_management_config_table_query": configure_properties.create_temp_config_table_query,
             "create_access_management_config_table_query": configure_properties.create_config_table_query,
         }
+        if configure_properties.previous_config_created_timestamp:
+            args[
+                "previous_access_management_config_created_timestamp"
+            ] = configure_properties.previous_config_created_timestamp
+        if configure_properties.state_hash:
+            args["access_management_state_hash"] = configure_properties.state_hash
+        if configure_properties.configured_identities is not None:
+            args["configured_identities"] = configure_properties.configured_identities
+        return args
 
     def prepare_data_masking_args(
         configure_properties: ConfigureMacroProperties,
     ) -> dict:
-        return {
+        args = {
             "temp_data_masking_config_table_name": configure_properties.temp_config_table_name,
             "config_data_masking_table_name": configure_properties.config_table_name,
             "create_temp_data_masking_config_table_query": configure_properties.create_temp_config_table_query,
             "create_data_masking_config_table_query": configure_properties.create_config_table_query,
         }
+        if configure_properties.previous_config_created_timestamp:
+            args[
+                "previous_data_masking_config_created_timestamp"
+            ] = configure_properties.previous_config_created_timestamp
+        if configure_properties.state_hash:
+            args["data_masking_state_hash"] = configure_properties.state_hash
+        return args
 
     def run_dbt_operation(operation_name: str, args: dict) -> None:
-        cmd = [
-            "run-operation",
-            operation_name,
-            "--args",
-            json.dumps(args),
-        ]
-        if target:
-            cmd.extend(["--target", target])
-        if variables:
-            cmd.extend(["--vars", variables])
-        res = dbt.invoke(cmd)
+        cmd = _get_run_operation_command(operation_name, args, target, variables)
+        with profiler.phase(f"run_operation:{operation_name}"):
+            res = dbt.invoke(cmd)
         if not res.success:
             exit(1)
 
+    def run_dbt_operations_in_parallel(operations: List[Tuple[str, dict]]) -> None:
+        # dbt invocations share global state and can't run in threads of the same process,
+        # so every operation gets its own process with its own adapter connection.
+        # Processes parsing the project on their own would write the same partial parse file
+        # and manifest.json at once, so the project is parsed here when there is no manifest to reuse
+        manifest = dbt.manifest or _get_dbt_runner(target, variables).manifest
+        failed_operations = []
+        with ProcessPoolExecutor(
+            max_workers=len(operations),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            futures = {
+                operation_name: executor.submit(
+                    _run_dbt_operation_in_subprocess,
+                    manifest,
+                    _get_run_operation_command(operation_name, args, target, variables),
+                )
+                for operation_name, args in operations
+            }
+            for operation_name, future in futures.items():
+                try:
+                    success = future.result()
+                except Exception as e:
+                    click.echo(f"{operation_name} failed: {e}", err=True)
+                    success = False
+                if not success:
+                    failed_operations.append(operation_name)
+        if failed_operations:
+            click.echo(f"Failed operations: {', '.join(failed_operations)}", err=True)
+            exit(1)
+
     if (
         configure_access_management_macro_properties
         and configure_data_masking_macro_properties
     ):
+        if parallel:
+            click.echo("Configuring access management and data masking in parallel...")
+            with profiler.phase("run_operations_in_parallel"):
+                run_dbt_operations_in_parallel(
+                    [
+                        (
+                            "dbt_access_management.configure_access_management",
+                            prepare_access_management_args(
+                                configure_access_management_macro_properties
+                            ),
+                        ),
+                        (
+                            "dbt_access_management.configure_data_masking",
+                            prepare_data_masking_args(
+                                configure_data_masking_macro_properties
+                            ),
+                        ),
+                    ]
+                )
+            return
+
         click.echo("Configuring access management and data masking...")
         combined_args = {
             **prepare_access_management_args(
@@ -212,13 +366,50 @@ def run_configure_macro(
                 configure_data_masking_macro_properties
             )
             run_dbt_operation(
-                "dbt_access_management.configure_data_masking", data_masking_args
+                "dbt_access_management.configure_data_masking",
+                data_masking_args,
+            )
+
+
+def _write_config_table_snapshots(
+    *configure_macro_properties: Optional[ConfigureMacroProperties],
+) -> None:
+    for configure_properties in configure_macro_properties:
+        if configure_properties and configure_properties.snapshot:
+            write_config_table_snapshot(
+                configure_properties.snapshot, configure_properties.snapshot_path
             )
 
 
-def _invoke_passed_dbt_command(command_list: List[str]) -> None:
+def _set_data_masking_plan(
+    configure_data_masking_macro_properties: Optional[ConfigureMacroProperties],
+) -> None:
+    if (
+        configure_data_masking_macro_properties is None
+        or configure_data_masking_macro_properties.data_masking_plan is None
+    ):
+        return
+    data_masking_plan = json.dumps(
+        configure_data_masking_macro_properties.data_masking_plan
+    )
+    os.makedirs(os.path.dirname(DATA_MASKING_PLAN_PATH), exist_ok=True)
+    with open(DATA_MASKING_PLAN_PATH, "w") as file:
+        file.write(data_masking_plan)
+    if len(data_masking_plan.encode("utf-8")) > DATA_MASKING_PLAN_MAX_ENV_VAR_BYTES:
+        click.echo(
+            "Data masking plan is too big for an environment variable, "
+            "post-hooks will load it from the configuration table"
+        )
+        os.environ.pop(DATA_MASKING_PLAN_ENV_VAR, None)
+        return
+    # The passed dbt command runs in this process, so the post-hooks read the plan with env_var()
+    os.environ[DATA_MASKING_PLAN_ENV_VAR] = data_masking_plan
+
+
+def _invoke_passed_dbt_command(dbt: dbtRunner, command_list: List[str]) -> None:
     click.echo("Running passed dbt command...")
-    res = dbt.invoke(command_list)
+    with profiler.phase("dbt_command"):
+        res = dbt.invoke(command_list)
     if not res.success:
         exit(1)
 
@@ -265,71 +456,357 @@ def cli():
     "multi project setup (for example using meshify or dbt-loom)",
     type=str,
 )
+@click.option(
+    "--reuse-manifest",
+    help="Set to false to parse the project again in every dbt invocation "
+    "instead of reusing the manifest parsed at the beginning of the command",
+    type=bool,
+    required=True,
+    default=True,
+)
+@click.option(
+    "--use-compile-cache",
+    help="Set to true to reuse the manifest of the last parse, or compilation with --reuse-manifest false, "
+    "when the project files, target, vars and used environment variables did not change since then",
+    type=bool,
+    required=True,
+    default=False,
+)
+@click.option(
+    "--sparse-access-management-config",
+    help="Set to true to store in the access management config table only rows with grants or revokes",
+    type=bool,
+    required=True,
+    default=False,
+)
+@click.option(
+    "--insert-batch-max-rows",
+    help="Maximum number of rows inserted into a config table by a single INSERT statement",
+    type=click.IntRange(min=1),
+    required=True,
+    default=DEFAULT_INSERT_BATCH_MAX_ROWS,
+)
+@click.option(
+    "--insert-batch-max-bytes",
+    help="Maximum size in bytes of the values inserted into a config table by a single INSERT statement",
+    type=click.IntRange(min=1),
+    required=True,
+    default=DEFAULT_INSERT_BATCH_MAX_BYTES,
+)
+@click.option(
+    "--config-table-dist-style",
+    help="Distribution style of the configuration tables",
+    type=click.Choice(
+        [dist_style.value for dist_style in DistStyle], case_sensitive=False
+    ),
+    required=True,
+    default=DistStyle.ALL.value,
+)
+@click.option(
+    "--config-table-sort-key",
+    help="Set to false to create the configuration tables without a compound sort key "
+    "on the columns by which the model post-hooks look up rows",
+    type=bool,
+    required=True,
+    default=True,
+)
+@click.option(
+    "--parallel-configuration",
+    help="Set to true to configure access management and data masking in parallel, "
+    "each in a separate process with its own database connection",
+    type=bool,
+    required=True,
+    default=False,
+)
+@click.option(
+    "--workers",
+    help="Number of processes which generate config table rows, "
+    "each from a contiguous shard of the project nodes",
+    type=click.IntRange(min=1),
+    required=True,
+    default=1,
+)
+@click.option(
+    "--incremental-config-refresh",
+    help="Set to true to upload only rows changed since the last configuration made from this directory, "
+    "using snapshots of the configuration tables stored in the target directory",
+    type=bool,
+    required=True,
+    default=False,
+)
+@click.option(
+    "--skip-unchanged-configuration",
+    help="Set to true to skip configuration when the generated configuration table rows "
+    "have the same hash as the rows applied by the last configuration, "
+    "which is stored in the access_management.dbt_am_configuration_state table",
+    type=bool,
+    required=True,
+    default=False,
+)
+@click.option(
+    "--profile",
+    help="Set to true to write wall time, peak memory and counts of every configuration phase "
+    "to target/dbt_am_profile.json",
+    type=bool,
+    required=True,
+    default=False,
+)
 def configure(
     dbt_command: str,
     configure_access_management: bool,
     configure_data_masking: bool,
     access_management_config_file_path: str,
     data_masking_config_file_path: str,
+    reuse_manifest: bool,
+    use_compile_cache: bool,
+    sparse_access_management_config: bool,
+    insert_batch_max_rows: int,
+    insert_batch_max_bytes: int,
+    config_table_dist_style: str,
+    config_table_sort_key: bool,
+    parallel_configuration: bool,
+    workers: int,
+    incremental_config_refresh: bool,
+    skip_unchanged_configuration: bool,
+    profile: bool,
     database_name: str = None,
 ):
-    command_list = _get_command_list(dbt_command)
-    target = _get_target(command_list)
-    variables = _get_variables(command_list)
+    with profiler.session(enabled=profile):
+        command_list = _get_command_list(dbt_command)
+        target = _get_target(command_list)
+        variables = _get_variables(command_list)
 
-    _invoke_compile_command(target, variables)
-
-    manifest = load_manifest()
-    project_name = manifest.metadata.project_name
-    sql_engine = manifest.metadata.adapter_type
-    if sql_engine.lower() not in SUPPORTED_SQL_ENGINES:
-        raise SQLEngineNotSupportedException()
+        fingerprint = (
+            get_project_fingerprint(target, variables) if use_compile_cache else None
+        )
+        if reuse_manifest:
+            cached_parsed_manifest = None
+            if use_compile_cache:
+                with profiler.phase("parsed_manifest_load"):
+                    cached_parsed_manifest = load_cached_parsed_manifest(fingerprint)
+            if cached_parsed_manifest:
+                click.echo(
+                    "Project has not changed since last parse, reusing parsed manifest..."
+                )
+                dbt = dbtRunner(manifest=cached_parsed_manifest)
+            else:
+                dbt = _get_dbt_runner(target, variables)
+                if use_compile_cache:
+                    cache_parsed_manifest(fingerprint, dbt.manifest)
+            # Model names, schemas and databases are resolved by parsing,
+            # so the parsed manifest is used without compiling the project
+            manifest = dbt.manifest
+        else:
+            dbt = dbtRunner()
+            cached_manifest_path = (
+                get_cached_manifest_path(fingerprint) if use_compile_cache else None
+            )
+            if cached_manifest_path:
+                click.echo(
+                    "Project has not changed since last compilation, skipping compile..."
+                )
+            else:
+                _invoke_compile_command(dbt, target, variables)
+                if use_compile_cache:
+                    cache_manifest(fingerprint)
+            with profiler.phase("manifest_load"):
+                manifest = (
+                    load_manifest(cached_manifest_path)
+                    if cached_manifest_path
+                    else load_manifest()
+                )
+        project_name = manifest.metadata.project_name
+        sql_engine = manifest.metadata.adapter_type
+        if sql_engine.lower() not in SUPPORTED_SQL_ENGINES:
+            raise SQLEngineNotSupportedException()
 
-    manifest_nodes = _get_manifest_nodes_eligible_for_configuration(
-        manifest, project_name
-    )
-    database_name = _get_database_name(manifest_nodes, database_name)
-    click.echo(
-        f"Running dbt-access-management configurations on {database_name} database..."
-    )
+        manifest_nodes = _get_manifest_nodes_eligible_for_configuration(
+            manifest, project_name
+        )
+        profiler.add_count("nodes", len(manifest_nodes))
+        database_name = _get_database_name(manifest_nodes, database_name)
+        click.echo(
+            f"Running dbt-access-management configurations on {database_name} database..."
+        )
+        insert_batch_config = InsertBatchConfig(
+            max_rows=insert_batch_max_rows, max_bytes=insert_batch_max_bytes
+        )
+        table_layout_config = TableLayoutConfig(
+            dist_style=DistStyle(config_table_dist_style.upper()),
+            sort_key=config_table_sort_key,
+        )
 
-    configure_access_management_macro_properties = (
-        (
-            get_configure_access_management_macro_properties(
-                manifest_nodes=manifest_nodes,
-                config_file_path=access_management_config_file_path,
-                sql_engine=sql_engine,
-                database_name=database_name,
-                project_name=project_name,
+        # Rows of the configuration tables are copied by the incremental refresh only when
+        # the tables hold the rows of the local snapshots, so only the query which is run is built
+        get_config_table_created_timestamp = (
+            (
+                lambda config_table_name: _get_config_table_created_timestamp(
+                    dbt, config_table_name, target, variables
+                )
             )
+            if incremental_config_refresh
+            else None
+        )
+        configure_access_management_macro_properties = (
+            (
+                get_configure_access_management_macro_properties(
+                    manifest_nodes=manifest_nodes,
+                    config_file_path=access_management_config_file_path,
+                    sql_engine=sql_engine,
+                    database_name=database_name,
+                    project_name=project_name,
+                    skip_rows_without_grants=sparse_access_management_config,
+                    insert_batch_config=insert_batch_config,
+                    table_layout_config=table_layout_config,
+                    workers=workers,
+                    incremental_refresh=incremental_config_refresh,
+                    skip_unchanged_configuration=skip_unchanged_configuration,
+                    get_config_table_created_timestamp=get_config_table_created_timestamp,
+                )
+            )
+            if configure_access_management
+            else None
         )
-        if configure_access_management
-        else None
-    )
 
-    configure_data_masking_macro_properties = (
-        (
-            get_configure_data_masking_macro_properties(
-                manifest_nodes=manifest_nodes,
-                config_file_path=data_masking_config_file_path,
-                project_name=project_name,
+        configure_data_masking_macro_properties = (
+            (
+                get_configure_data_masking_macro_properties(
+                    manifest_nodes=manifest_nodes,
+                    config_file_path=data_masking_config_file_path,
+                    project_name=project_name,
+                    insert_batch_config=insert_batch_config,
+                    table_layout_config=table_layout_config,
+                    workers=workers,
+                    incremental_refresh=incremental_config_refresh,
+                    skip_unchanged_configuration=skip_unchanged_configuration,
+                    get_config_table_created_timestamp=get_config_table_created_timestamp,
+                )
             )
+            if configure_data_masking
+            else None
         )
-        if configure_data_masking
-        else None
-    )
 
-    run_configure_macro(
-        configure_access_management_macro_properties=configure_access_management_macro_properties,
-        configure_data_masking_macro_properties=configure_data_masking_macro_properties,
-        target=target,
-        variables=variables,
-    )
+        run_configure_macro(
+            dbt=dbt,
+            configure_access_management_macro_properties=configure_access_management_macro_properties,
+            configure_data_masking_macro_properties=configure_data_masking_macro_properties,
+            target=target,
+            variables=variables,
+            parallel=parallel_configuration,
+        )
+        _write_config_table_snapshots(
+            configure_access_management_macro_properties,
+            configure_data_masking_macro_properties,
+        )
+        _set_data_masking_plan(configure_data_masking_macro_properties)
 
-    _invoke_passed_dbt_command(command_list)
+        _invoke_passed_dbt_command(dbt, command_list)
 
 
 cli.add_command(configure)
 
+
+def _parse_access_levels_mix(ctx, param, value: str) -> Dict[AccessLevel, int]:
+    access_levels_mix = {}
+    try:
+        for access_level_weight in value.split(","):
+            access_level, weight = access_level_weight.split("=")
+            access_levels_mix[AccessLevel(access_level.strip())] = int(weight)
+    except ValueError:
+        raise click.BadParameter(
+            "expected comma separated `<access_level>=<weight>` pairs, "
+            f"where access level is one of: {', '.join(a.value for a in AccessLevel)}"
+        )
+    if any(weight < 0 for weight in access_levels_mix.values()):
+        raise click.BadParameter("weights can't be negative")
+    if sum(access_levels_mix.values()) <= 0:
+        raise click.BadParameter("at least one weight must be positive")
+    return access_levels_mix
+
+
+@click.command()
+@click.option(
+    "--output-dir",
+    help="Directory in which target/manifest.json, access_management.yml and data_masking.yml are written",
+    type=str,
+    default="synthetic_project",
+)
+@click.option("--project-name", type=str, default="synthetic_project")
+@click.option("--database-name", type=str, default="synthetic_db")
+@click.option("--models", type=click.IntRange(min=0), default=1000)
+@click.option("--seeds", type=click.IntRange(min=0), default=0)
+@click.option("--snapshots", type=click.IntRange(min=0), default=0)
+@click.option(
+    "--folder-depth",
+    help="Number of folders between the resource folder (models, seeds, snapshots) and every file",
+    type=click.IntRange(min=0),
+    default=2,
+)
+@click.option("--folders-per-level", type=click.IntRange(min=1), default=5)
+@click.option("--schemas", type=click.IntRange(min=1), default=5)
+@click.option("--users", type=click.IntRange(min=0), default=10)
+@click.option("--roles", type=click.IntRange(min=0), default=0)
+@click.option("--groups", type=click.IntRange(min=0), default=0)
+@click.option(
+    "--config-paths-per-identity",
+    help="Number of folders with access level configured for every identity",
+    type=click.IntRange(min=0),
+    default=3,
+)
+@click.option(
+    "--masked-columns-per-model",
+    help="Number of masked columns configured for every model",
+    type=click.IntRange(min=0),
+    default=0,
+)
+@click.option(
+    "--access-levels-mix",
+    help="Weights of the configured access levels, e.g. read=3,write=1,read_write=1,all=0",
+    type=str,
+    default="read=1,write=1,read_write=1,all=1",
+    callback=_parse_access_levels_mix,
+)
+@click.option("--random-seed", type=int, default=0)
+def generate_synthetic_project(
+    output_dir: str,
+    project_name: str,
+    database_name: str,
+    models: int,
+    seeds: int,
+    snapshots: int,
+    folder_depth: int,
+    folders_per_level: int,
+    schemas: int,
+    users: int,
+    roles: int,
+    groups: int,
+    config_paths_per_identity: int,
+    masked_columns_per_model: int,
+    access_levels_mix: Dict[AccessLevel, int],
+    random_seed: int,
+):
+    config = SyntheticProjectConfig(
+        project_name=project_name,
+        database_name=database_name,
+        models=models,
+        seeds=seeds,
+        snapshots=snapshots,
+        folder_depth=folder_depth,
+        folders_per_level=folders_per_level,
+        schemas=schemas,
+        users=users,
+        roles=roles,
+        groups=groups,
+        config_paths_per_identity=config_paths_per_identity,
+        masked_columns_per_model=masked_columns_per_model,
+        access_levels_mix=access_levels_mix,
+        random_seed=random_seed,
+    )
+    write_synthetic_project(config, output_dir)
+    click.echo(f"Synthetic project written to {output_dir}")
+
+
+cli.add_command(generate_synthetic_project)
+
 if __name__ == "__main__":
     cli()
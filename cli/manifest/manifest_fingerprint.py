@@ -0,0 +1,166 @@
+import hashlib
+import os
+import pickle
+import re
+import shutil
+from typing import Any, Dict, List, Optional, Set
+
+import yaml
+from dbt.contracts.graph.manifest import Manifest
+from dbt.version import __version__ as dbt_version
+
+from cli.constants import (
+    CACHED_MANIFEST_PATH,
+    CACHED_PARSED_MANIFEST_PATH,
+    MANIFEST_FINGERPRINT_PATH,
+    MANIFEST_PATH,
+)
+
+DEFAULT_PROJECT_PATHS = {
+    "model-paths": ["models"],
+    "seed-paths": ["seeds"],
+    "snapshot-paths": ["snapshots"],
+    "macro-paths": ["macros"],
+    "analysis-paths": ["analyses"],
+    "test-paths": ["tests"],
+    "docs-paths": [],
+}
+PROJECT_FILES = [
+    "dbt_project.yml",
+    "packages.yml",
+    "dependencies.yml",
+    "package-lock.yml",
+    "selectors.yml",
+]
+# Names of environment variables read with env_var() in project files, profiles.yml and packages
+ENV_VAR_NAME_PATTERN = re.compile(rb"env_var\(\s*['\"]([^'\"]+)['\"]")
+
+
+def _read_project_config(project_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(project_dir, "dbt_project.yml"), "r") as file:
+        return yaml.safe_load(file) or {}
+
+
+def _get_project_paths(project_config: Dict[str, Any]) -> List[str]:
+    paths = []
+    for key, default_paths in DEFAULT_PROJECT_PATHS.items():
+        paths.extend(project_config.get(key, default_paths))
+    paths.append(project_config.get("packages-install-path", "dbt_packages"))
+    return sorted(set(paths))
+
+
+def _get_profiles_file_path(project_dir: str) -> Optional[str]:
+    profiles_dirs = [
+        os.environ.get("DBT_PROFILES_DIR"),
+        project_dir,
+        os.path.join(os.path.expanduser("~"), ".dbt"),
+    ]
+    for profiles_dir in profiles_dirs:
+        if profiles_dir and os.path.isfile(os.path.join(profiles_dir, "profiles.yml")):
+            return os.path.join(profiles_dir, "profiles.yml")
+    return None
+
+
+def _update_with_file(
+    fingerprint: Any, file_path: str, name: str, env_var_names: Set[str]
+) -> None:
+    fingerprint.update(name.encode() + b"\0")
+    with open(file_path, "rb") as file:
+        content = file.read()
+    fingerprint.update(hashlib.sha256(content).digest())
+    env_var_names.update(
+        env_var_name.decode("utf-8", "replace")
+        for env_var_name in ENV_VAR_NAME_PATTERN.findall(content)
+    )
+
+
+def get_project_fingerprint(
+    target: str = None, variables: str = None, project_dir: str = "."
+) -> str:
+    fingerprint = hashlib.sha256()
+    env_var_names = set()
+    fingerprint.update(
+        f"dbt={dbt_version}\0target={target}\0vars={variables}\0".encode()
+    )
+
+    for file_name in PROJECT_FILES:
+        file_path = os.path.join(project_dir, file_name)
+        if os.path.isfile(file_path):
+            _update_with_file(fingerprint, file_path, file_name, env_var_names)
+
+    profiles_file_path = _get_profiles_file_path(project_dir)
+    if profiles_file_path:
+        _update_with_file(
+            fingerprint, profiles_file_path, "profiles.yml", env_var_names
+        )
+
+    for project_path in _get_project_paths(_read_project_config(project_dir)):
+        for root, dirs, files in os.walk(os.path.join(project_dir, project_path)):
+            dirs.sort()
+            for file_name in sorted(files):
+                file_path = os.path.join(root, file_name)
+                _update_with_file(
+                    fingerprint,
+                    file_path,
+                    os.path.relpath(file_path, project_dir).replace("\\", "/"),
+                    env_var_names,
+                )
+
+    for env_var_name in sorted(env_var_names):
+        fingerprint.update(
+            f"env:{env_var_name}={os.environ.get(env_var_name)}\0".encode()
+        )
+
+    return fingerprint.hexdigest()
+
+
+def get_cached_manifest_path(
+    fingerprint: str,
+    cached_manifest_path: str = CACHED_MANIFEST_PATH,
+    fingerprint_path: str = MANIFEST_FINGERPRINT_PATH,
+) -> Optional[str]:
+    if not os.path.isfile(cached_manifest_path) or not os.path.isfile(fingerprint_path):
+        return None
+    with open(fingerprint_path, "r") as file:
+        if file.read().strip() != fingerprint:
+            return None
+    return cached_manifest_path
+
+
+def cache_manifest(
+    fingerprint: str,
+    manifest_path: str = MANIFEST_PATH,
+    cached_manifest_path: str = CACHED_MANIFEST_PATH,
+    fingerprint_path: str = MANIFEST_FINGERPRINT_PATH,
+) -> None:
+    if os.path.isfile(fingerprint_path):
+        os.remove(fingerprint_path)
+    shutil.copyfile(manifest_path, cached_manifest_path)
+    with open(fingerprint_path, "w") as file:
+        file.write(fingerprint)
+
+
+def load_cached_parsed_manifest(
+    fingerprint: str, cached_parsed_manifest_path: str = CACHED_PARSED_MANIFEST_PATH
+) -> Optional[Manifest]:
+    if not os.path.isfile(cached_parsed_manifest_path):
+        return None
+    with open(cached_parsed_manifest_path, "rb") as file:
+        # The fingerprint is pickled before the manifest, so a stale manifest is not loaded
+        if pickle.load(file) != fingerprint:
+            return None
+        return pickle.load(file)
+
+
+def cache_parsed_manifest(
+    fingerprint: str,
+    manifest: Manifest,
+    cached_parsed_manifest_path: str = CACHED_PARSED_MANIFEST_PATH,
+) -> None:
+    os.makedirs(os.path.dirname(cached_parsed_manifest_path), exist_ok=True)
+    # The cache is replaced only when fully written, so an interrupted write leaves no partial manifest
+    temp_cached_parsed_manifest_path = f"{cached_parsed_manifest_path}.tmp"
+    with open(temp_cached_parsed_manifest_path, "wb") as file:
+        pickle.dump(fingerprint, file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(manifest, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_cached_parsed_manifest_path, cached_parsed_manifest_path)
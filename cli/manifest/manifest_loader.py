@@ -0,0 +1,178 @@
+import json
+import re
+from typing import Any, Dict, Iterator, NamedTuple, Optional, TextIO
+
+from cli.constants import MANIFEST_PATH
+
+CHUNK_SIZE = 1024 * 1024
+PROJECTED_RESOURCE_TYPES = ("model", "seed", "snapshot")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_VALUE_TERMINATORS = frozenset(",:]} \t\n\r")
+
+
+class ManifestMetadataProjection(NamedTuple):
+    project_name: Optional[str]
+    adapter_type: Optional[str]
+
+
+class ManifestNodeConfigProjection(NamedTuple):
+    materialized: Optional[str]
+
+
+class ManifestNodeProjection(NamedTuple):
+    resource_type: str
+    package_name: str
+    database: Optional[str]
+    schema: str
+    name: str
+    config: ManifestNodeConfigProjection
+    original_file_path: str
+
+
+class ManifestProjection(NamedTuple):
+    metadata: ManifestMetadataProjection
+    nodes: Dict[str, ManifestNodeProjection]
+
+
+class _JsonStreamReader:
+    """Reads a JSON document incrementally, decoding one value at a time.
+
+    Only the value currently being decoded is kept in memory, so large documents
+    can be walked without materializing them as a whole.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _read_chunk(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        position = self._position
+        self._buffer = self._buffer[position:] + chunk
+        self._position = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self._position = _WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_chunk(self._chunk_size):
+                raise ValueError("Unexpected end of JSON document")
+
+    def _consume(self, expected: str) -> None:
+        found = self._peek()
+        if found != expected:
+            raise ValueError(
+                f"Expected '{expected}' but found '{found}' in JSON document"
+            )
+        self._position += 1
+
+    def read_value(self) -> Any:
+        self._peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+                # A number at the end of the buffer may continue in the next chunk
+                if self._eof or (
+                    end < len(self._buffer) and self._buffer[end] in _VALUE_TERMINATORS
+                ):
+                    self._position = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._read_chunk(size)
+            size *= 2
+
+    def iter_object(self) -> Iterator[str]:
+        """Yields object keys, the caller has to consume the value of each key."""
+        self._consume("{")
+        if self._peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key = self.read_value()
+            self._consume(":")
+            yield key
+            separator = self._peek()
+            self._position += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Unexpected '{separator}' in JSON object")
+
+    def iter_array(self) -> Iterator[None]:
+        """Yields once per array element, the caller has to consume the element."""
+        self._consume("[")
+        if self._peek() == "]":
+            self._position += 1
+            return
+        while True:
+            yield
+            separator = self._peek()
+            self._position += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Unexpected '{separator}' in JSON array")
+
+    def skip_value(self) -> None:
+        first_character = self._peek()
+        if first_character == "{":
+            for _ in self.iter_object():
+                self.read_value()
+        elif first_character == "[":
+            for _ in self.iter_array():
+                self.read_value()
+        else:
+            self.read_value()
+
+
+def _project_node(node: Dict[str, Any]) -> ManifestNodeProjection:
+    return ManifestNodeProjection(
+        resource_type=node.get("resource_type"),
+        package_name=node.get("package_name"),
+        database=node.get("database"),
+        schema=node.get("schema"),
+        name=node.get("name"),
+        config=ManifestNodeConfigProjection(
+            materialized=(node.get("config") or {}).get("materialized")
+        ),
+        original_file_path=node.get("original_file_path"),
+    )
+
+
+def load_manifest(manifest_path: str = MANIFEST_PATH) -> ManifestProjection:
+    metadata = ManifestMetadataProjection(project_name=None, adapter_type=None)
+    nodes = {}
+
+    with open(manifest_path, "r") as file:
+        reader = _JsonStreamReader(file, CHUNK_SIZE)
+        for key in reader.iter_object():
+            if key == "metadata":
+                metadata_data = reader.read_value()
+                metadata = ManifestMetadataProjection(
+                    project_name=metadata_data.get("project_name"),
+                    adapter_type=metadata_data.get("adapter_type"),
+                )
+            elif key == "nodes":
+                for unique_id in reader.iter_object():
+                    node = reader.read_value()
+                    if node.get("resource_type") in PROJECTED_RESOURCE_TYPES:
+                        nodes[unique_id] = _project_node(node)
+            else:
+                reader.skip_value()
+
+    return ManifestProjection(metadata=metadata, nodes=nodes)
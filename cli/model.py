@@ -1,7 +1,17 @@
 from enum import Enum
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
+from cli.config_snapshot import ConfigTableSnapshot
+from cli.constants import DEFAULT_INSERT_BATCH_MAX_ROWS, DEFAULT_INSERT_BATCH_MAX_BYTES
+
+
+class DistStyle(str, Enum):
+    ALL = "ALL"
+    EVEN = "EVEN"
+    AUTO = "AUTO"
+
 
 class ModelType(str, Enum):
     MODEL = "model"
@@ -24,3 +34,19 @@ class ConfigureMacroProperties(BaseModel):
     config_table_name: str
     create_temp_config_table_query: str
     create_config_table_query: str
+    previous_config_created_timestamp: Optional[str] = None
+    state_hash: Optional[str] = None
+    snapshot: Optional[ConfigTableSnapshot] = None
+    snapshot_path: Optional[str] = None
+    data_masking_plan: Optional[Dict[str, List[Dict]]] = None
+    configured_identities: Optional[List[Dict[str, str]]] = None
+
+
+class InsertBatchConfig(BaseModel):
+    max_rows: int = DEFAULT_INSERT_BATCH_MAX_ROWS
+    max_bytes: int = DEFAULT_INSERT_BATCH_MAX_BYTES
+
+
+class TableLayoutConfig(BaseModel):
+    dist_style: DistStyle = DistStyle.ALL
+    sort_key: bool = True
@@ -0,0 +1,47 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _split_into_shards(items: Sequence[T], shards_count: int) -> List[Sequence[T]]:
+    shard_size, remainder = divmod(len(items), shards_count)
+    shards = []
+    start = 0
+    for shard_index in range(shards_count):
+        end = start + shard_size + (1 if shard_index < remainder else 0)
+        shards.append(items[start:end])
+        start = end
+    return shards
+
+
+def map_in_shards(
+    function: Callable[..., List[R]],
+    items: Sequence[T],
+    workers: int,
+    *args: Any,
+) -> List[R]:
+    """Calls `function(shard, *args)` on contiguous shards of `items` in a process pool
+    and concatenates the returned lists in the order of `items`.
+
+    With a single worker `function` is called on all items in the current process.
+    `function` and `args` must be picklable.
+    """
+    shards_count = min(workers, len(items))
+    if shards_count <= 1:
+        return function(items, *args)
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=shards_count,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        for shard_result in executor.map(
+            function,
+            _split_into_shards(items, shards_count),
+            *[[arg] * shards_count for arg in args],
+        ):
+            results.extend(shard_result)
+    return results
@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import click
+from pydantic import BaseModel
+
+try:
+    import resource
+except ImportError:
+    # `resource` is not available on Windows, peak memory is not reported there
+    resource = None
+
+from cli.constants import PROFILE_REPORT_PATH
+
+
+def _get_peak_memory_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class ProfiledPhase(BaseModel):
+    name: str
+    wall_time_seconds: float
+    peak_memory_bytes: Optional[int] = None
+
+
+class ProfileReport(BaseModel):
+    started_at: str
+    wall_time_seconds: float
+    peak_memory_bytes: Optional[int] = None
+    phases: List[ProfiledPhase] = []
+    counts: Dict[str, int] = {}
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self._started_at = None
+        self._start_time = None
+        self._phases: List[ProfiledPhase] = []
+        self._counts: Dict[str, int] = {}
+
+    def start(self) -> None:
+        self.enabled = True
+        self._started_at = datetime.now().isoformat(timespec="seconds")
+        self._start_time = time.perf_counter()
+        self._phases = []
+        self._counts = {}
+
+    @contextmanager
+    def session(
+        self, enabled: bool, report_path: str = PROFILE_REPORT_PATH
+    ) -> Iterator[None]:
+        if not enabled:
+            yield
+            return
+        self.start()
+        try:
+            yield
+        finally:
+            self.write_report(report_path)
+            self.enabled = False
+            click.echo(f"Profile report written to {report_path}")
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases.append(
+                ProfiledPhase(
+                    name=name,
+                    wall_time_seconds=round(time.perf_counter() - start_time, 6),
+                    peak_memory_bytes=_get_peak_memory_bytes(),
+                )
+            )
+
+    def add_count(self, name: str, value: int) -> None:
+        if self.enabled:
+            self._counts[name] = self._counts.get(name, 0) + value
+
+    def get_report(self) -> ProfileReport:
+        return ProfileReport(
+            started_at=self._started_at,
+            wall_time_seconds=round(time.perf_counter() - self._start_time, 6),
+            peak_memory_bytes=_get_peak_memory_bytes(),
+            phases=list(self._phases),
+            counts=dict(self._counts),
+        )
+
+    def write_report(self, report_path: str = PROFILE_REPORT_PATH) -> None:
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "w") as file:
+            json.dump(self.get_report().model_dump(), file, indent=2)
+
+
+profiler = Profiler()
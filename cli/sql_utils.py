@@ -0,0 +1,135 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def _chunk_values(
+    values: Iterable[str], max_rows: int, max_bytes: int
+) -> Iterator[List[str]]:
+    chunk = []
+    chunk_bytes = 0
+    for value in values:
+        value_bytes = len(value.encode("utf-8"))
+        if chunk and (len(chunk) >= max_rows or chunk_bytes + value_bytes > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(value)
+        chunk_bytes += value_bytes + 2
+    if chunk:
+        yield chunk
+
+
+def build_row_value_sql(row_content_sql: str, current_timestamp: str) -> str:
+    return (
+        f"({row_content_sql}, "
+        f"TO_TIMESTAMP('{current_timestamp}', 'YYYY-MM-DD HH24:MI:SS'))"
+    )
+
+
+def build_insert_statements_sql(
+    table_name: str,
+    columns: str,
+    values: Iterable[str],
+    max_rows: int,
+    max_bytes: int,
+) -> str:
+    """Builds INSERT statements for rendered rows, each holding at most `max_rows` rows
+    and about `max_bytes` bytes of values, so no single statement exceeds database limits.
+    """
+    insert_statements_sql = ""
+    for chunk in _chunk_values(values, max_rows, max_bytes):
+        insert_statements_sql += f"""
+        INSERT INTO access_management.{table_name}
+        ({columns})
+        VALUES
+        """
+        insert_statements_sql += ",\n".join(chunk) + ";"
+    return insert_statements_sql
+
+
+def _build_key_values_sql(key_values: Tuple[str, ...]) -> str:
+    return "(" + ", ".join("'" + v.replace("'", "''") + "'" for v in key_values) + ")"
+
+
+def build_copy_rows_except_keys_sql(
+    source_table_name: str,
+    table_name: str,
+    row_columns: str,
+    key_columns: str,
+    excluded_keys: List[Tuple[str, ...]],
+    source_created_timestamp: str,
+    current_timestamp: str,
+    max_rows: int,
+    max_bytes: int,
+) -> str:
+    """Builds INSERT ... SELECT statement copying rows of `source_table_name` created at
+    `source_created_timestamp`, except rows with `excluded_keys`, as rows created at
+    `current_timestamp`.
+
+    Excluded keys are inserted into a temporary table in batches of at most `max_rows` rows
+    and about `max_bytes` bytes, and the copied rows are anti-joined with it,
+    so no single statement grows with the number of excluded keys.
+    """
+    key_column_names = [column.strip() for column in key_columns.split(",")]
+    excluded_keys_table_name = f"{table_name}_excluded_keys"
+    copy_rows_sql = ""
+    if excluded_keys:
+        excluded_keys_columns_sql = ", ".join(
+            f"{column} TEXT" for column in key_column_names
+        )
+        copy_rows_sql += f"""
+        CREATE TEMP TABLE {excluded_keys_table_name} ({excluded_keys_columns_sql});"""
+        for chunk in _chunk_values(
+            (_build_key_values_sql(excluded_key) for excluded_key in excluded_keys),
+            max_rows,
+            max_bytes,
+        ):
+            copy_rows_sql += f"""
+        INSERT INTO {excluded_keys_table_name}
+        ({key_columns})
+        VALUES
+        """
+            copy_rows_sql += ",\n".join(chunk) + ";"
+    copy_rows_sql += f"""
+        INSERT INTO access_management.{table_name}
+        ({row_columns}, created_timestamp)
+        SELECT {row_columns}, TO_TIMESTAMP('{current_timestamp}', 'YYYY-MM-DD HH24:MI:SS')
+        FROM access_management.{source_table_name} AS source_row
+        WHERE created_timestamp = TO_TIMESTAMP('{source_created_timestamp}', 'YYYY-MM-DD HH24:MI:SS')"""
+    if excluded_keys:
+        excluded_key_conditions_sql = " AND ".join(
+            f"excluded_key.{column} = source_row.{column}"
+            for column in key_column_names
+        )
+        copy_rows_sql += f"""
+        AND NOT EXISTS (
+            SELECT 1 FROM {excluded_keys_table_name} AS excluded_key
+            WHERE {excluded_key_conditions_sql}
+        );
+        DROP TABLE {excluded_keys_table_name}"""
+    return copy_rows_sql + ";\n"
+
+
+def build_replace_table_rows_sql(
+    staging_table_name: str, table_name: str, columns: str
+) -> str:
+    """Builds statements replacing all rows of `table_name` with rows of fully built
+    `staging_table_name`, so the table holds only the current version of rows.
+
+    The table is not dropped, so queries of concurrent dbt runs and privileges granted on it
+    are not affected. Run the statements in a single transaction, so readers never see
+    the table half written.
+    """
+    return f"""
+        DELETE FROM access_management.{table_name};
+        INSERT INTO access_management.{table_name}
+        ({columns})
+        SELECT {columns}
+        FROM access_management.{staging_table_name};
+        """
+
+
+def build_table_layout_sql(dist_style: str, sort_key_columns: Optional[str]) -> str:
+    table_layout_sql = f"\nDISTSTYLE {dist_style}"
+    if sort_key_columns:
+        table_layout_sql += f"\nCOMPOUND SORTKEY ({sort_key_columns})"
+    return table_layout_sql
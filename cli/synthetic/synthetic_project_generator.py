@@ -0,0 +1,220 @@
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+import yaml
+
+from pydantic import BaseModel
+
+from cli.access_mangement.access_management_config_file_parser import (
+    AccessLevel,
+    IdentityType,
+)
+from cli.constants import SQLEngine
+from cli.model import ManifestNode, ModelType
+
+RESOURCE_FOLDERS = {
+    ModelType.MODEL: "models",
+    ModelType.SEED: "seeds",
+    ModelType.SNAPSHOT: "snapshots",
+}
+RESOURCE_FILE_EXTENSIONS = {
+    ModelType.MODEL: ".sql",
+    ModelType.SEED: ".csv",
+    ModelType.SNAPSHOT: ".sql",
+}
+RESOURCE_MATERIALIZATIONS = {
+    ModelType.MODEL: ("table", "view", "incremental"),
+    ModelType.SEED: ("seed",),
+    ModelType.SNAPSHOT: ("snapshot",),
+}
+
+
+class SyntheticProjectConfig(BaseModel):
+    project_name: str = "synthetic_project"
+    database_name: str = "synthetic_db"
+    models: int = 1000
+    seeds: int = 0
+    snapshots: int = 0
+    folder_depth: int = 2
+    folders_per_level: int = 5
+    schemas: int = 5
+    users: int = 10
+    roles: int = 0
+    groups: int = 0
+    config_paths_per_identity: int = 3
+    masked_columns_per_model: int = 0
+    identities_with_column_access: int = 2
+    access_levels_mix: Dict[AccessLevel, int] = {
+        AccessLevel.READ: 1,
+        AccessLevel.WRITE: 1,
+        AccessLevel.READ_WRITE: 1,
+        AccessLevel.ALL: 1,
+    }
+    random_seed: int = 0
+
+
+def _get_folders(config: SyntheticProjectConfig, index: int) -> List[str]:
+    return [
+        f"folder_{level}_{(index // config.folders_per_level ** level) % config.folders_per_level}"
+        for level in range(config.folder_depth)
+    ]
+
+
+def _get_identity_names(
+    config: SyntheticProjectConfig, identity_type: IdentityType
+) -> List[str]:
+    identities_count = {
+        IdentityType.USER: config.users,
+        IdentityType.ROLE: config.roles,
+        IdentityType.GROUP: config.groups,
+    }[identity_type]
+    return [f"{identity_type.value}_{i}" for i in range(identities_count)]
+
+
+def generate_manifest_nodes(config: SyntheticProjectConfig) -> List[ManifestNode]:
+    manifest_nodes = []
+    resources_count = {
+        ModelType.MODEL: config.models,
+        ModelType.SEED: config.seeds,
+        ModelType.SNAPSHOT: config.snapshots,
+    }
+    for model_type, count in resources_count.items():
+        materializations = RESOURCE_MATERIALIZATIONS[model_type]
+        for i in range(count):
+            model_name = f"{model_type.value}_{i}"
+            path = "/".join(
+                [RESOURCE_FOLDERS[model_type]]
+                + _get_folders(config, i)
+                + [model_name + RESOURCE_FILE_EXTENSIONS[model_type]]
+            )
+            manifest_nodes.append(
+                ManifestNode(
+                    database_name=config.database_name,
+                    model_type=model_type,
+                    model_name=model_name,
+                    schema_name=f"schema_{i % config.schemas}",
+                    materialization=materializations[i % len(materializations)],
+                    path=path,
+                )
+            )
+    return manifest_nodes
+
+
+def _get_random_config_path(
+    config: SyntheticProjectConfig, rng: random.Random
+) -> List[str]:
+    resource_folders = [RESOURCE_FOLDERS[ModelType.MODEL]]
+    if config.seeds:
+        resource_folders.append(RESOURCE_FOLDERS[ModelType.SEED])
+    if config.snapshots:
+        resource_folders.append(RESOURCE_FOLDERS[ModelType.SNAPSHOT])
+    depth = rng.randint(0, config.folder_depth)
+    return [rng.choice(resource_folders)] + [
+        f"folder_{level}_{rng.randrange(config.folders_per_level)}"
+        for level in range(depth)
+    ]
+
+
+def generate_access_management_config(
+    config: SyntheticProjectConfig,
+) -> Dict[str, Any]:
+    """Returns content of `access_management.yml` for the synthetic project."""
+    rng = random.Random(config.random_seed)
+    access_levels = list(config.access_levels_mix.keys())
+    access_levels_weights = list(config.access_levels_mix.values())
+
+    identities_config = {}
+    for identity_type in (IdentityType.USER, IdentityType.ROLE, IdentityType.GROUP):
+        identity_type_config = {}
+        for identity_name in _get_identity_names(config, identity_type):
+            identity_config = {}
+            for _ in range(config.config_paths_per_identity):
+                path_config = identity_config
+                for folder in _get_random_config_path(config, rng):
+                    path_config = path_config.setdefault(folder, {})
+                path_config["+access_level"] = rng.choices(
+                    access_levels, access_levels_weights
+                )[0].value
+            identity_type_config[identity_name] = identity_config
+        if identity_type_config:
+            identities_config[f"{identity_type.value}s"] = identity_type_config
+
+    return {"databases": {config.database_name: identities_config}}
+
+
+def generate_data_masking_config(config: SyntheticProjectConfig) -> Dict[str, Any]:
+    """Returns content of `data_masking.yml` for the synthetic project."""
+    rng = random.Random(config.random_seed)
+    users = _get_identity_names(config, IdentityType.USER)
+    roles = _get_identity_names(config, IdentityType.ROLE)
+
+    tables_config = []
+    if config.masked_columns_per_model:
+        for i in range(config.models):
+            columns_config = []
+            for j in range(config.masked_columns_per_model):
+                columns_config.append(
+                    {
+                        f"column_{j}": {
+                            "users_with_access": rng.sample(
+                                users,
+                                min(config.identities_with_column_access, len(users)),
+                            ),
+                            "roles_with_access": rng.sample(
+                                roles,
+                                min(config.identities_with_column_access, len(roles)),
+                            ),
+                        }
+                    }
+                )
+            tables_config.append(
+                {f"{ModelType.MODEL.value}_{i}": {"columns": columns_config}}
+            )
+    return {"configuration": tables_config}
+
+
+def generate_manifest(
+    config: SyntheticProjectConfig, manifest_nodes: List[ManifestNode]
+) -> Dict[str, Any]:
+    """Returns content of `manifest.json` with the given nodes, limited to the fields read by the CLI."""
+    nodes = {}
+    for node in manifest_nodes:
+        unique_id = f"{node.model_type.value}.{config.project_name}.{node.model_name}"
+        nodes[unique_id] = {
+            "resource_type": node.model_type.value,
+            "package_name": config.project_name,
+            "database": node.database_name,
+            "schema": node.schema_name,
+            "name": node.model_name,
+            "alias": node.model_name,
+            "unique_id": unique_id,
+            "fqn": [config.project_name] + node.path.rsplit(".", 1)[0].split("/")[1:],
+            "path": node.path.split("/", 1)[1],
+            "original_file_path": node.path,
+            "config": {"enabled": True, "materialized": node.materialization},
+        }
+    return {
+        "metadata": {
+            "dbt_schema_version": "https://schemas.getdbt.com/dbt/manifest/v12.json",
+            "project_name": config.project_name,
+            "adapter_type": SQLEngine.REDSHIFT.value,
+        },
+        "nodes": nodes,
+        "sources": {},
+        "macros": {},
+        "parent_map": {unique_id: [] for unique_id in nodes},
+        "child_map": {unique_id: [] for unique_id in nodes},
+    }
+
+
+def write_synthetic_project(config: SyntheticProjectConfig, output_dir: str) -> None:
+    manifest_path = os.path.join(output_dir, "target", "manifest.json")
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, "w") as file:
+        json.dump(generate_manifest(config, generate_manifest_nodes(config)), file)
+    with open(os.path.join(output_dir, "access_management.yml"), "w") as file:
+        yaml.safe_dump(generate_access_management_config(config), file)
+    with open(os.path.join(output_dir, "data_masking.yml"), "w") as file:
+        yaml.safe_dump(generate_data_masking_config(config), file)
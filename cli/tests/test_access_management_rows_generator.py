@@ -7,6 +7,7 @@ from cli.access_mangement.access_management_config_file_parser import (
 from cli.access_mangement.access_management_rows_generator import (
     AccessManagementRow,
     generate_access_management_rows,
+    generate_access_management_row_records,
 )
 from cli.model import ManifestNode, ModelType
 
@@ -474,3 +475,166 @@ def test_generate_access_management_rows_extended_case_two_users():
         data_base_access_config, manifest_nodes, "my_project", "redshift"
     )
     assert result == expected_result
+
+
+def test_generate_access_management_rows_most_specific_path_per_identity():
+    data_base_access_config = DataBaseAccessConfig(
+        database_name="some_db",
+        access_config_identities=[
+            AccessConfigIdentity(
+                identity_type=IdentityType.GROUP,
+                identity_name="group_1",
+                config_paths=[
+                    ("/", AccessLevel.READ),
+                    ("/seeds/", AccessLevel.ALL),
+                    ("/seeds/staging/", AccessLevel.WRITE),
+                ],
+            ),
+            AccessConfigIdentity(
+                identity_type=IdentityType.ROLE,
+                identity_name="role_1",
+                config_paths=[("/models/", AccessLevel.READ)],
+            ),
+        ],
+    )
+    manifest_nodes = [
+        ManifestNode(
+            database_name="some_db",
+            model_type=ModelType.SEED,
+            model_name="user_type",
+            schema_name="staging",
+            materialization="seed",
+            path="seeds/staging/user_type.csv",
+        ),
+    ]
+
+    expected_result = [
+        AccessManagementRow(
+            project_name="my_project",
+            database_name="some_db",
+            schema_name="staging",
+            model_name="user_type",
+            materialization="seed",
+            identity_type=IdentityType.GROUP,
+            identity_name="group_1",
+            grants={
+                'GRANT USAGE ON SCHEMA staging TO GROUP \\"group_1\\";',
+                'GRANT INSERT ON staging.user_type TO GROUP \\"group_1\\";',
+                'GRANT UPDATE ON staging.user_type TO GROUP \\"group_1\\";',
+            },
+            revokes={
+                'REVOKE INSERT ON staging.user_type FROM GROUP \\"group_1\\";',
+                'REVOKE UPDATE ON staging.user_type FROM GROUP \\"group_1\\";',
+            },
+        ),
+        AccessManagementRow(
+            project_name="my_project",
+            database_name="some_db",
+            schema_name="staging",
+            model_name="user_type",
+            materialization="seed",
+            identity_type=IdentityType.ROLE,
+            identity_name="role_1",
+            grants=set(),
+            revokes=set(),
+        ),
+    ]
+    result = generate_access_management_rows(
+        data_base_access_config, manifest_nodes, "my_project", "redshift"
+    )
+    assert result == expected_result
+
+
+def test_generate_access_management_rows_skip_rows_without_grants():
+    data_base_access_config = DataBaseAccessConfig(
+        database_name="some_db",
+        access_config_identities=[
+            AccessConfigIdentity(
+                identity_type=IdentityType.USER,
+                identity_name="user_1",
+                config_paths=[("/models/staging/", AccessLevel.READ)],
+            ),
+            AccessConfigIdentity(
+                identity_type=IdentityType.USER,
+                identity_name="user_2",
+                config_paths=[("/models/marts/", AccessLevel.READ)],
+            ),
+        ],
+    )
+    manifest_nodes = [
+        ManifestNode(
+            database_name="some_db",
+            model_type=ModelType.MODEL,
+            model_name="user",
+            schema_name="staging",
+            materialization="table",
+            path="models/staging/user.sql",
+        ),
+    ]
+
+    expected_result = [
+        AccessManagementRow(
+            project_name="my_project",
+            database_name="some_db",
+            schema_name="staging",
+            model_name="user",
+            materialization="table",
+            identity_type=IdentityType.USER,
+            identity_name="user_1",
+            grants={
+                'GRANT SELECT ON staging.user TO \\"user_1\\";',
+                'GRANT USAGE ON SCHEMA staging TO \\"user_1\\";',
+            },
+            revokes={'REVOKE SELECT ON staging.user FROM \\"user_1\\";'},
+        )
+    ]
+    result = generate_access_management_rows(
+        data_base_access_config,
+        manifest_nodes,
+        "my_project",
+        "redshift",
+        skip_rows_without_grants=True,
+    )
+    assert result == expected_result
+
+
+def test_generate_access_management_row_records_share_nodes_and_identities():
+    identity = AccessConfigIdentity(
+        identity_type=IdentityType.ROLE,
+        identity_name="role_1",
+        config_paths=[("/models/staging/", AccessLevel.READ)],
+    )
+    data_base_access_config = DataBaseAccessConfig(
+        database_name="some_db",
+        access_config_identities=[identity],
+    )
+    node = ManifestNode(
+        database_name="some_db",
+        model_type=ModelType.MODEL,
+        model_name="user",
+        schema_name="staging",
+        materialization="table",
+        path="models/staging/user.sql",
+    )
+
+    result = generate_access_management_row_records(
+        data_base_access_config, [node], "my_project", "redshift"
+    )
+
+    assert len(result) == 1
+    assert result[0].node is node
+    assert result[0].identity is identity
+    assert result[0].to_row() == AccessManagementRow(
+        project_name="my_project",
+        database_name="some_db",
+        schema_name="staging",
+        model_name="user",
+        materialization="table",
+        identity_type=IdentityType.ROLE,
+        identity_name="role_1",
+        grants={
+            'GRANT SELECT ON staging.user TO ROLE \\"role_1\\";',
+            'GRANT USAGE ON SCHEMA staging TO ROLE \\"role_1\\";',
+        },
+        revokes={'REVOKE SELECT ON staging.user FROM ROLE \\"role_1\\";'},
+    )
@@ -0,0 +1,141 @@
+from cli.config_snapshot import (
+    ConfigTableDeltaCollector,
+    ConfigTableSnapshot,
+    ConfigTableStateHash,
+    collect_row_entries,
+    get_row_digest,
+    get_row_key,
+    load_config_table_snapshot,
+    write_config_table_snapshot,
+)
+
+
+def _get_snapshot(rows) -> ConfigTableSnapshot:
+    return ConfigTableSnapshot(
+        table_name="my_project_access_management_config",
+        columns="schema_name, model_name, grants, created_timestamp",
+        created_timestamp="2024-01-01 00:00:00",
+        rows={row_key: get_row_digest(content) for row_key, content in rows},
+    )
+
+
+def test_config_table_delta_collector_without_previous_snapshot():
+    delta_collector = ConfigTableDeltaCollector(None)
+
+    delta_collector.add(get_row_key("staging", "user"), "'staging', 'user', '[]'")
+
+    assert delta_collector.changed_row_contents == ["'staging', 'user', '[]'"]
+    assert delta_collector.get_excluded_row_keys() == []
+
+
+def test_config_table_delta_collector_collects_changed_and_removed_rows():
+    delta_collector = ConfigTableDeltaCollector(
+        _get_snapshot(
+            [
+                (get_row_key("staging", "user"), "'staging', 'user', '[]'"),
+                (get_row_key("staging", "order"), "'staging', 'order', '[]'"),
+                (get_row_key("staging", "item"), "'staging', 'item', '[]'"),
+            ]
+        )
+    )
+
+    delta_collector.add(get_row_key("staging", "user"), "'staging', 'user', '[]'")
+    delta_collector.add(
+        get_row_key("staging", "order"), "'staging', 'order', '[\"GRANT\"]'"
+    )
+    delta_collector.add(get_row_key("staging", "payment"), "'staging', 'payment', '[]'")
+
+    assert delta_collector.changed_row_contents == [
+        "'staging', 'order', '[\"GRANT\"]'",
+        "'staging', 'payment', '[]'",
+    ]
+    assert delta_collector.get_excluded_row_keys() == [
+        get_row_key("staging", "order"),
+        get_row_key("staging", "item"),
+    ]
+    assert set(delta_collector.rows) == {
+        get_row_key("staging", "user"),
+        get_row_key("staging", "order"),
+        get_row_key("staging", "payment"),
+    }
+
+
+def test_config_table_delta_collector_incremental_refresh_not_worth_it():
+    delta_collector = ConfigTableDeltaCollector(
+        _get_snapshot([(get_row_key("staging", "user"), "'staging', 'user', '[]'")])
+    )
+
+    delta_collector.add(get_row_key("staging", "user"), "'staging', 'user', '[1]'")
+
+    assert not delta_collector.is_incremental_refresh_worth_it()
+
+
+def test_config_table_state_hash_does_not_depend_on_rows_order():
+    first_state_hash = ConfigTableStateHash("schema_name, model_name")
+    first_state_hash.add(get_row_key("staging", "user"), "'staging', 'user'")
+    first_state_hash.add(get_row_key("staging", "order"), "'staging', 'order'")
+    second_state_hash = ConfigTableStateHash("schema_name, model_name")
+    second_state_hash.add(get_row_key("staging", "order"), "'staging', 'order'")
+    second_state_hash.add(get_row_key("staging", "user"), "'staging', 'user'")
+
+    assert first_state_hash.hexdigest() == second_state_hash.hexdigest()
+
+
+def test_config_table_state_hash_changes_with_rows_and_columns():
+    state_hash = ConfigTableStateHash("schema_name, model_name")
+    state_hash.add(get_row_key("staging", "user"), "'staging', 'user'")
+    changed_row_state_hash = ConfigTableStateHash("schema_name, model_name")
+    changed_row_state_hash.add(get_row_key("staging", "user"), "'staging', 'users'")
+    changed_columns_state_hash = ConfigTableStateHash("schema_name, table_name")
+    changed_columns_state_hash.add(get_row_key("staging", "user"), "'staging', 'user'")
+
+    assert state_hash.hexdigest() != changed_row_state_hash.hexdigest()
+    assert state_hash.hexdigest() != changed_columns_state_hash.hexdigest()
+    assert (
+        state_hash.hexdigest()
+        != ConfigTableStateHash("schema_name, model_name").hexdigest()
+    )
+
+
+def test_collect_row_entries_passes_rows_to_collectors():
+    row_entries = [
+        (get_row_key("staging", "user"), "'staging', 'user', '[]'"),
+        (get_row_key("staging", "order"), "'staging', 'order', '[]'"),
+    ]
+    delta_collector = ConfigTableDeltaCollector(_get_snapshot(row_entries[:1]))
+    state_hash = ConfigTableStateHash("schema_name, model_name, grants")
+
+    collected_row_entries = collect_row_entries(
+        iter(row_entries), [delta_collector, state_hash]
+    )
+
+    assert collected_row_entries == row_entries
+    assert delta_collector.changed_row_contents == ["'staging', 'order', '[]'"]
+    assert delta_collector.has_changes()
+
+
+def test_load_config_table_snapshot(tmp_path):
+    snapshot_path = str(tmp_path / "target" / "snapshot.json")
+    snapshot = _get_snapshot(
+        [(get_row_key("staging", "user"), "'staging', 'user', '[]'")]
+    )
+    write_config_table_snapshot(snapshot, snapshot_path)
+
+    assert (
+        load_config_table_snapshot(snapshot_path, snapshot.table_name, snapshot.columns)
+        == snapshot
+    )
+    assert (
+        load_config_table_snapshot(snapshot_path, "other_table", snapshot.columns)
+        is None
+    )
+    assert (
+        load_config_table_snapshot(snapshot_path, snapshot.table_name, "other_columns")
+        is None
+    )
+    assert (
+        load_config_table_snapshot(
+            str(tmp_path / "missing.json"), snapshot.table_name, snapshot.columns
+        )
+        is None
+    )
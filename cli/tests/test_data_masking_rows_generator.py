@@ -6,6 +6,8 @@ from cli.data_masking.data_masking_config_file_parser import (
 from cli.data_masking.data_masking_rows_generator import (
     DataMaskingRow,
     generate_data_masking_rows,
+    generate_data_masking_row_records,
+    get_data_masking_plan,
 )
 from cli.model import ManifestNode, ModelType
 
@@ -286,3 +288,85 @@ def test_generate_data_masking_rows_many_columns_with_roles_and_users_with_acces
     ]
     result = generate_data_masking_rows(data_masking_config, manifest_nodes)
     assert result == expected_result
+
+
+def test_generate_data_masking_row_records_render_masking_config_on_access():
+    model_config = ModelDataMaskingConfig(
+        model_name="dummy_model",
+        column_masking_identities=[
+            ColumnMaskingConfig(
+                column_name="col1",
+                users_with_access=["user1"],
+                roles_with_access=[],
+            )
+        ],
+    )
+    data_masking_config = DataMaskingConfig(model_masking_identities=[model_config])
+    manifest_nodes = [
+        ManifestNode(
+            database_name="some_db",
+            model_name="dummy_model",
+            model_type=ModelType.MODEL,
+            schema_name="staging",
+            materialization="table",
+            path="staging/dummy_model.sql",
+        ),
+        ManifestNode(
+            database_name="some_db",
+            model_name="other_model",
+            model_type=ModelType.MODEL,
+            schema_name="staging",
+            materialization="view",
+            path="staging/other_model.sql",
+        ),
+    ]
+
+    result = generate_data_masking_row_records(data_masking_config, manifest_nodes)
+
+    assert [record.model_config for record in result] == [model_config, None]
+    assert result[0].masking_config == [
+        {
+            "column_name": "col1",
+            "users_with_access": ["user1"],
+            "roles_with_access": [],
+        }
+    ]
+    assert result[1].masking_config == []
+
+
+def test_get_data_masking_plan_contains_only_masked_models():
+    data_masking_config = DataMaskingConfig(
+        model_masking_identities=[
+            ModelDataMaskingConfig(
+                model_name="user",
+                column_masking_identities=[
+                    ColumnMaskingConfig(
+                        column_name="email",
+                        users_with_access=["user_1"],
+                        roles_with_access=["role_1"],
+                    )
+                ],
+            )
+        ],
+    )
+    manifest_nodes = [
+        ManifestNode(
+            database_name="some_db",
+            model_name=model_name,
+            model_type=ModelType.MODEL,
+            schema_name="staging",
+            materialization="table",
+            path=f"models/staging/{model_name}.sql",
+        )
+        for model_name in ["user", "order"]
+    ]
+
+    assert get_data_masking_plan(data_masking_config, manifest_nodes) == {
+        "staging.user": [
+            {
+                "column_name": "email",
+                "users_with_access": ["user_1"],
+                "roles_with_access": ["role_1"],
+            }
+        ]
+    }
@@ -0,0 +1,120 @@
+import os
+
+from dbt.contracts.graph.manifest import Manifest
+
+from cli.manifest.manifest_fingerprint import (
+    get_project_fingerprint,
+    get_cached_manifest_path,
+    cache_manifest,
+    load_cached_parsed_manifest,
+    cache_parsed_manifest,
+)
+
+
+def _create_project(project_dir) -> None:
+    os.makedirs(os.path.join(project_dir, "models", "staging"))
+    os.makedirs(os.path.join(project_dir, "target"))
+    with open(os.path.join(project_dir, "dbt_project.yml"), "w") as file:
+        file.write("name: my_project\n")
+    with open(os.path.join(project_dir, "models", "staging", "user.sql"), "w") as file:
+        file.write("select 1 as id")
+
+
+def test_get_project_fingerprint_is_stable(tmp_path):
+    _create_project(tmp_path)
+
+    assert get_project_fingerprint(
+        "dev", None, project_dir=str(tmp_path)
+    ) == get_project_fingerprint("dev", None, project_dir=str(tmp_path))
+
+
+def test_get_project_fingerprint_changes_with_target_and_vars(tmp_path):
+    _create_project(tmp_path)
+    fingerprint = get_project_fingerprint("dev", None, project_dir=str(tmp_path))
+
+    assert fingerprint != get_project_fingerprint(
+        "prod", None, project_dir=str(tmp_path)
+    )
+    assert fingerprint != get_project_fingerprint(
+        "dev", "{'my_var': 1}", project_dir=str(tmp_path)
+    )
+
+
+def test_get_project_fingerprint_changes_with_model_files(tmp_path):
+    _create_project(tmp_path)
+    fingerprint = get_project_fingerprint("dev", None, project_dir=str(tmp_path))
+
+    with open(os.path.join(tmp_path, "models", "staging", "user.sql"), "w") as file:
+        file.write("select 2 as id")
+
+    assert fingerprint != get_project_fingerprint(
+        "dev", None, project_dir=str(tmp_path)
+    )
+
+
+def test_get_project_fingerprint_changes_with_used_env_vars(tmp_path, monkeypatch):
+    _create_project(tmp_path)
+    with open(os.path.join(tmp_path, "models", "staging", "user.sql"), "w") as file:
+        file.write('select \'{{ env_var("USER_SOURCE", "raw") }}\' as source')
+    monkeypatch.setenv("USER_SOURCE", "raw")
+    monkeypatch.setenv("UNUSED_VARIABLE", "a")
+    fingerprint = get_project_fingerprint("dev", None, project_dir=str(tmp_path))
+
+    monkeypatch.setenv("UNUSED_VARIABLE", "b")
+    assert fingerprint == get_project_fingerprint(
+        "dev", None, project_dir=str(tmp_path)
+    )
+
+    monkeypatch.setenv("USER_SOURCE", "stage")
+    assert fingerprint != get_project_fingerprint(
+        "dev", None, project_dir=str(tmp_path)
+    )
+
+
+def test_get_project_fingerprint_ignores_target_directory(tmp_path):
+    _create_project(tmp_path)
+    fingerprint = get_project_fingerprint("dev", None, project_dir=str(tmp_path))
+
+    with open(os.path.join(tmp_path, "target", "run_results.json"), "w") as file:
+        file.write("{}")
+
+    assert fingerprint == get_project_fingerprint(
+        "dev", None, project_dir=str(tmp_path)
+    )
+
+
+def test_get_cached_manifest_path(tmp_path):
+    manifest_path = os.path.join(tmp_path, "manifest.json")
+    cached_manifest_path = os.path.join(tmp_path, "dbt_am_manifest.json")
+    fingerprint_path = os.path.join(tmp_path, "dbt_am_manifest_fingerprint")
+    with open(manifest_path, "w") as file:
+        file.write("{}")
+
+    assert (
+        get_cached_manifest_path("abc", cached_manifest_path, fingerprint_path) is None
+    )
+
+    cache_manifest("abc", manifest_path, cached_manifest_path, fingerprint_path)
+
+    assert (
+        get_cached_manifest_path("abc", cached_manifest_path, fingerprint_path)
+        == cached_manifest_path
+    )
+    assert (
+        get_cached_manifest_path("def", cached_manifest_path, fingerprint_path) is None
+    )
+
+
+def test_load_cached_parsed_manifest(tmp_path):
+    cached_parsed_manifest_path = os.path.join(
+        tmp_path, "dbt_am_parsed_manifest.pickle"
+    )
+
+    assert load_cached_parsed_manifest("abc", cached_parsed_manifest_path) is None
+
+    cache_parsed_manifest("abc", Manifest(), cached_parsed_manifest_path)
+
+    assert isinstance(
+        load_cached_parsed_manifest("abc", cached_parsed_manifest_path), Manifest
+    )
+    assert load_cached_parsed_manifest("def", cached_parsed_manifest_path) is None
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from cli.manifest.manifest_loader import (
+    load_manifest,
+    ManifestMetadataProjection,
+    ManifestNodeProjection,
+    ManifestNodeConfigProjection,
+)
+
+MANIFEST = {
+    "metadata": {
+        "dbt_schema_version": "https://schemas.getdbt.com/dbt/manifest/v12.json",
+        "project_name": "my_project",
+        "adapter_type": "redshift",
+    },
+    "nodes": {
+        "model.my_project.user": {
+            "resource_type": "model",
+            "package_name": "my_project",
+            "database": "some_db",
+            "schema": "staging",
+            "name": "user",
+            "config": {"materialized": "table", "tags": []},
+            "original_file_path": "models/staging/user.sql",
+            "raw_code": "select 1 as id, 2.5e3 as amount",
+        },
+        "seed.my_project.user_type": {
+            "resource_type": "seed",
+            "package_name": "my_project",
+            "database": "some_db",
+            "schema": "staging",
+            "name": "user_type",
+            "config": {"materialized": "seed"},
+            "original_file_path": "seeds/user_type.csv",
+        },
+        "test.my_project.not_null_user_id": {
+            "resource_type": "test",
+            "package_name": "my_project",
+            "database": "some_db",
+            "schema": "staging",
+            "name": "not_null_user_id",
+            "config": {"materialized": "test"},
+            "original_file_path": "models/staging/schema.yml",
+        },
+    },
+    "macros": {"macro.my_project.some_macro": {"macro_sql": "{% macro x() %}"}},
+    "parent_map": {"model.my_project.user": []},
+    "selectors": {},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 1024 * 1024])
+def test_load_manifest(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr("cli.manifest.manifest_loader.CHUNK_SIZE", chunk_size)
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(MANIFEST, indent=2))
+
+    result = load_manifest(str(manifest_path))
+
+    assert result.metadata == ManifestMetadataProjection(
+        project_name="my_project", adapter_type="redshift"
+    )
+    assert result.nodes == {
+        "model.my_project.user": ManifestNodeProjection(
+            resource_type="model",
+            package_name="my_project",
+            database="some_db",
+            schema="staging",
+            name="user",
+            config=ManifestNodeConfigProjection(materialized="table"),
+            original_file_path="models/staging/user.sql",
+        ),
+        "seed.my_project.user_type": ManifestNodeProjection(
+            resource_type="seed",
+            package_name="my_project",
+            database="some_db",
+            schema="staging",
+            name="user_type",
+            config=ManifestNodeConfigProjection(materialized="seed"),
+            original_file_path="seeds/user_type.csv",
+        ),
+    }
+
+
+def test_load_manifest_truncated_file(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(MANIFEST)[:-20])
+
+    with pytest.raises(ValueError):
+        load_manifest(str(manifest_path))
@@ -0,0 +1,58 @@
+from cli.access_mangement.access_management_config_file_parser import (
+    AccessConfigIdentity,
+    IdentityType,
+    AccessLevel,
+    DataBaseAccessConfig,
+)
+from cli.access_mangement.configure_access_management_macro_properties_provider import (
+    _build_access_management_row_entries,
+)
+from cli.model import ManifestNode, ModelType
+from cli.process_pool import _split_into_shards, map_in_shards
+
+
+def test_split_into_shards_keeps_order_of_items():
+    shards = _split_into_shards(list(range(7)), 3)
+
+    assert shards == [[0, 1, 2], [3, 4], [5, 6]]
+
+
+def test_map_in_shards_returns_the_same_values_as_a_single_worker():
+    data_base_access_config = DataBaseAccessConfig(
+        database_name="some_db",
+        access_config_identities=[
+            AccessConfigIdentity(
+                identity_type=IdentityType.USER,
+                identity_name="user_1",
+                config_paths=[("/models/staging/", AccessLevel.READ)],
+            ),
+            AccessConfigIdentity(
+                identity_type=IdentityType.ROLE,
+                identity_name="role_1",
+                config_paths=[("/models/", AccessLevel.ALL)],
+            ),
+        ],
+    )
+    manifest_nodes = [
+        ManifestNode(
+            database_name="some_db",
+            model_type=ModelType.MODEL,
+            model_name=f"model_{i}",
+            schema_name="staging",
+            materialization="table",
+            path=f"models/{'staging' if i % 2 else 'marts'}/model_{i}.sql",
+        )
+        for i in range(5)
+    ]
+    args = (
+        data_base_access_config,
+        "my_project",
+        "redshift",
+        False,
+    )
+
+    result = map_in_shards(
+        _build_access_management_row_entries, manifest_nodes, 2, *args
+    )
+
+    assert result == _build_access_management_row_entries(manifest_nodes, *args)
@@ -0,0 +1,33 @@
+import json
+
+from cli.profiler import Profiler
+
+
+def test_profiler_records_phases_and_counts(tmp_path):
+    report_path = str(tmp_path / "target" / "profile.json")
+    profiler = Profiler()
+
+    with profiler.session(enabled=True, report_path=report_path):
+        with profiler.phase("compile"):
+            pass
+        profiler.add_count("rows", 2)
+        profiler.add_count("rows", 3)
+
+    with open(report_path) as file:
+        report = json.load(file)
+    assert [phase["name"] for phase in report["phases"]] == ["compile"]
+    assert report["counts"] == {"rows": 5}
+    assert report["wall_time_seconds"] >= report["phases"][0]["wall_time_seconds"]
+    assert not profiler.enabled
+
+
+def test_disabled_profiler_does_not_record(tmp_path):
+    report_path = str(tmp_path / "profile.json")
+    profiler = Profiler()
+
+    with profiler.session(enabled=False, report_path=report_path):
+        with profiler.phase("compile"):
+            pass
+        profiler.add_count("rows", 2)
+
+    assert not (tmp_path / "profile.json").exists()
@@ -0,0 +1,137 @@
+from cli.sql_utils import (
+    build_insert_statements_sql,
+    build_copy_rows_except_keys_sql,
+    build_replace_table_rows_sql,
+    build_table_layout_sql,
+)
+
+
+def test_build_insert_statements_sql_splits_by_max_rows():
+    values = [f"({i})" for i in range(5)]
+
+    insert_statements_sql = build_insert_statements_sql(
+        "my_table", "id", values, max_rows=2, max_bytes=1024
+    )
+
+    assert insert_statements_sql.count("INSERT INTO access_management.my_table") == 3
+    assert "(0),\n(1);" in insert_statements_sql
+    assert "(2),\n(3);" in insert_statements_sql
+    assert "(4);" in insert_statements_sql
+
+
+def test_build_insert_statements_sql_splits_by_max_bytes():
+    values = ["('" + "a" * 10 + "')"] * 3
+
+    insert_statements_sql = build_insert_statements_sql(
+        "my_table", "name", values, max_rows=100, max_bytes=30
+    )
+
+    assert insert_statements_sql.count("INSERT INTO access_management.my_table") == 2
+
+
+def test_build_insert_statements_sql_keeps_value_larger_than_max_bytes():
+    insert_statements_sql = build_insert_statements_sql(
+        "my_table", "name", ["('" + "a" * 100 + "')"], max_rows=100, max_bytes=10
+    )
+
+    assert insert_statements_sql.count("INSERT INTO access_management.my_table") == 1
+
+
+def test_build_insert_statements_sql_without_values():
+    assert (
+        build_insert_statements_sql("my_table", "id", [], max_rows=100, max_bytes=1024)
+        == ""
+    )
+
+
+def test_build_copy_rows_except_keys_sql_excludes_keys():
+    copy_rows_sql = build_copy_rows_except_keys_sql(
+        "config_table",
+        "temp_table",
+        "schema_name, model_name, grants",
+        "schema_name, model_name",
+        [("staging", "user"), ("staging", "o'rder"), ("marts", "sales")],
+        "2024-01-01 00:00:00",
+        "2024-01-02 00:00:00",
+        max_rows=2,
+        max_bytes=1024,
+    )
+
+    assert (
+        "CREATE TEMP TABLE temp_table_excluded_keys (schema_name TEXT, model_name TEXT);"
+        in copy_rows_sql
+    )
+    assert copy_rows_sql.count("INSERT INTO temp_table_excluded_keys") == 2
+    assert "('staging', 'user'),\n('staging', 'o''rder');" in copy_rows_sql
+    assert "('marts', 'sales');" in copy_rows_sql
+    assert "INSERT INTO access_management.temp_table" in copy_rows_sql
+    assert "FROM access_management.config_table" in copy_rows_sql
+    assert (
+        "WHERE created_timestamp = TO_TIMESTAMP('2024-01-01 00:00:00'" in copy_rows_sql
+    )
+    assert "AND NOT EXISTS (" in copy_rows_sql
+    assert (
+        "excluded_key.schema_name = source_row.schema_name "
+        "AND excluded_key.model_name = source_row.model_name" in copy_rows_sql
+    )
+    assert "NOT IN" not in copy_rows_sql
+    assert copy_rows_sql.index("NOT EXISTS") < copy_rows_sql.index(
+        "DROP TABLE temp_table_excluded_keys;"
+    )
+
+
+def test_build_copy_rows_except_keys_sql_splits_excluded_keys_by_max_bytes():
+    copy_rows_sql = build_copy_rows_except_keys_sql(
+        "config_table",
+        "temp_table",
+        "schema_name, model_name, grants",
+        "schema_name, model_name",
+        [("staging", f"model_{i}") for i in range(100)],
+        "2024-01-01 00:00:00",
+        "2024-01-02 00:00:00",
+        max_rows=10000,
+        max_bytes=200,
+    )
+
+    assert copy_rows_sql.count("INSERT INTO temp_table_excluded_keys") > 1
+
+
+def test_build_copy_rows_except_keys_sql_without_excluded_keys():
+    copy_rows_sql = build_copy_rows_except_keys_sql(
+        "config_table",
+        "temp_table",
+        "schema_name, model_name, grants",
+        "schema_name, model_name",
+        [],
+        "2024-01-01 00:00:00",
+        "2024-01-02 00:00:00",
+        max_rows=2,
+        max_bytes=1024,
+    )
+
+    assert "NOT EXISTS" not in copy_rows_sql
+    assert "excluded_keys" not in copy_rows_sql
+
+
+def test_build_replace_table_rows_sql():
+    replace_table_rows_sql = build_replace_table_rows_sql(
+        "temp_table", "config_table", "schema_name, model_name"
+    )
+
+    assert replace_table_rows_sql.index(
+        "DELETE FROM access_management.config_table;"
+    ) < replace_table_rows_sql.index("INSERT INTO access_management.config_table")
+    assert (
+        "SELECT schema_name, model_name\n        FROM access_management.temp_table;"
+        in replace_table_rows_sql
+    )
+    assert "DROP TABLE" not in replace_table_rows_sql
+    assert "RENAME" not in replace_table_rows_sql
+
+
+def test_build_table_layout_sql():
+    assert (
+        build_table_layout_sql("ALL", "schema_name, model_name")
+        == "\nDISTSTYLE ALL\nCOMPOUND SORTKEY (schema_name, model_name)"
+    )
+    assert build_table_layout_sql("AUTO", None) == "\nDISTSTYLE AUTO"
@@ -0,0 +1,94 @@
+import yaml
+
+from cli.access_mangement.access_management_config_file_parser import (
+    parse_access_management_config,
+    IdentityType,
+)
+from cli.access_mangement.access_management_rows_generator import (
+    generate_access_management_rows,
+)
+from cli.data_masking.data_masking_config_file_parser import parse_data_masking_config
+from cli.data_masking.data_masking_rows_generator import generate_data_masking_rows
+from cli.main import _get_manifest_nodes_eligible_for_configuration
+from cli.manifest.manifest_loader import load_manifest
+from cli.model import ModelType
+from cli.synthetic.synthetic_project_generator import (
+    SyntheticProjectConfig,
+    generate_manifest_nodes,
+    generate_access_management_config,
+    generate_data_masking_config,
+    write_synthetic_project,
+)
+
+
+def test_generated_configs_are_parsed_by_config_parsers(tmp_path):
+    config = SyntheticProjectConfig(
+        models=20,
+        seeds=5,
+        snapshots=3,
+        folder_depth=3,
+        folders_per_level=2,
+        users=4,
+        roles=2,
+        groups=1,
+        masked_columns_per_model=2,
+    )
+    access_management_config_path = str(tmp_path / "access_management.yml")
+    data_masking_config_path = str(tmp_path / "data_masking.yml")
+    with open(access_management_config_path, "w") as file:
+        yaml.safe_dump(generate_access_management_config(config), file)
+    with open(data_masking_config_path, "w") as file:
+        yaml.safe_dump(generate_data_masking_config(config), file)
+
+    manifest_nodes = generate_manifest_nodes(config)
+    access_management_config = parse_access_management_config(
+        access_management_config_path
+    )
+    data_masking_config = parse_data_masking_config(data_masking_config_path)
+
+    assert [n.model_type for n in manifest_nodes].count(ModelType.SEED) == 5
+    assert (
+        manifest_nodes[-1].path
+        == "snapshots/folder_0_0/folder_1_1/folder_2_0/snapshot_2.sql"
+    )
+    identities = access_management_config.databases_access_config[
+        0
+    ].access_config_identities
+    assert [i.identity_type for i in identities].count(IdentityType.ROLE) == 2
+    assert len(
+        generate_access_management_rows(
+            access_management_config.databases_access_config[0],
+            manifest_nodes,
+            config.project_name,
+            "redshift",
+        )
+    ) == len(manifest_nodes) * len(identities)
+    data_masking_rows = generate_data_masking_rows(data_masking_config, manifest_nodes)
+    assert len([row for row in data_masking_rows if row.masking_config]) == 20
+    assert (
+        len(data_masking_config.model_masking_identities[0].column_masking_identities)
+        == 2
+    )
+
+
+def test_generated_access_management_config_is_deterministic():
+    config = SyntheticProjectConfig(users=5, random_seed=1)
+
+    assert generate_access_management_config(
+        config
+    ) == generate_access_management_config(config)
+
+
+def test_written_synthetic_project_is_loaded_by_manifest_loader(tmp_path):
+    config = SyntheticProjectConfig(models=30, seeds=4, snapshots=2, roles=2)
+
+    write_synthetic_project(config, str(tmp_path))
+
+    manifest = load_manifest(str(tmp_path / "target" / "manifest.json"))
+    assert manifest.metadata.project_name == config.project_name
+    assert manifest.metadata.adapter_type == "redshift"
+    assert _get_manifest_nodes_eligible_for_configuration(
+        manifest, config.project_name
+    ) == generate_manifest_nodes(config)
+    assert parse_access_management_config(str(tmp_path / "access_management.yml"))
+    assert parse_data_masking_config(str(tmp_path / "data_masking.yml"))
@@ -0,0 +1,184 @@
+{% macro get_built_relation_keys(results) %}
+    {# Returns `schema.model` of every model, seed and snapshot of the project successfully built in the run #}
+    {% set relation_keys = [] %}
+    {% for result in results %}
+        {% if result.status == 'success' and result.node.resource_type in ['model', 'seed', 'snapshot']
+            and result.node.package_name == project_name and result.node.config.materialized != 'ephemeral' %}
+            {% do relation_keys.append(result.node.schema ~ '.' ~ result.node.name) %}
+        {% endif %}
+    {% endfor %}
+    {{ return(relation_keys | unique | list) }}
+{% endmacro %}
+
+{% macro run_statements_in_batches(statements, max_statements_per_batch) %}
+    {% for statements_batch in statements | batch(max_statements_per_batch) %}
+        {% set batch_query %}
+            BEGIN;
+            {{ statements_batch | join('\n') }}
+            COMMIT;
+        {% endset %}
+        {{ log("Running batch " ~ loop.index ~ " of " ~ loop.length ~ ":\n" ~ batch_query, info=True) }}
+        {% do dbt.run_query(batch_query) %}
+    {% endfor %}
+{% endmacro %}
+
+{% macro execute_grants_for_results(results, max_statements_per_batch=500) %}
+    {#
+        Alternative to the execute_grants_for_model post-hook, intended for on-run-end:
+            on-run-end:
+              - "{{ dbt_access_management.execute_grants_for_results(results) }}"
+        Grants of all relations built in the run are looked up with one query,
+        consolidated and executed in batches, each batch in its own transaction.
+    #}
+    {% if execute %}
+        {% set relation_keys = dbt_access_management.get_built_relation_keys(results) %}
+        {% set config_table_name = project_name ~ '_access_management_config' %}
+        {% if relation_keys | length == 0 %}
+            {{ log("No built relations; skipping grants execution.", info=True) }}
+        {% elif dbt_access_management.get_config_table_created_timestamp(config_table_name) is none %}
+            {{ log("Table access_management." ~ config_table_name ~ " does not exist; skipping grants execution.", info=True) }}
+        {% else %}
+            {% set database_identities = dbt_access_management.get_run_database_identities() %}
+            {% set grants_per_model = dbt_access_management.get_grants_for_models(config_table_name, relation_keys, database_identities) %}
+            {% set all_grants = [] %}
+            {% for grants in grants_per_model.values() %}
+                {% do all_grants.extend(grants) %}
+            {% endfor %}
+            {% if all_grants %}
+                {% do dbt_access_management.run_statements_in_batches(dbt_access_management.consolidate_statements(all_grants), max_statements_per_batch) %}
+            {% else %} {{ log("No grants to execute.", info=True) }}
+            {% endif %}
+        {% endif %}
+    {% endif %}
+{% endmacro %}
+
+{% macro apply_masking_policies_for_results(results, max_statements_per_batch=500) %}
+    {#
+        Alternative to the apply_masking_policies_for_model post-hook, intended for on-run-end:
+            on-run-end:
+              - "{{ dbt_access_management.apply_masking_policies_for_results(results) }}"
+        Masking policies configured for relations built in the run are compared with the attached ones,
+        so policies kept by incremental models and snapshots are not attached again,
+        and the missing ones are attached in batches, each batch in its own transaction.
+    #}
+    {% if execute %}
+        {% set relation_keys = dbt_access_management.get_built_relation_keys(results) %}
+        {% set masking_configs = dbt_access_management.get_masking_configs_for_relations(relation_keys) %}
+        {% if masking_configs | length == 0 %}
+            {{ log("No masking configured for built relations", info=True) }}
+        {% else %}
+            {% set database_identities = dbt_access_management.get_run_database_identities() %}
+            {% set users_identities = dbt_access_management.get_users(database_identities) %}
+            {% set roles_identities = dbt_access_management.get_roles(database_identities) %}
+            {% set attached_policy_keys = {} %}
+            {% for attached_policy in dbt_access_management.get_attached_masking_policies(masking_configs | map(attribute='relation_key') | unique | list) %}
+                {% do attached_policy_keys.update({(attached_policy['schema_name'], attached_policy['model_name'], attached_policy['column_name'], attached_policy['grantee'], attached_policy['grantee_type']): true}) %}
+            {% endfor %}
+
+            {% set policies_to_attach = [] %}
+            {% for masking_config in masking_configs %}
+                {% set grantees = [('public', 'public')] %}
+                {% for user in masking_config['users_with_access'] if user in users_identities %}
+                    {% do grantees.append((user, 'user')) %}
+                {% endfor %}
+                {% for role in masking_config['roles_with_access'] if role in roles_identities %}
+                    {% do grantees.append((role, 'role')) %}
+                {% endfor %}
+                {% for grantee, grantee_type in grantees %}
+                    {% if (masking_config['schema_name'], masking_config['model_name'], masking_config['column_name'], grantee, grantee_type) not in attached_policy_keys %}
+                        {% do policies_to_attach.append({
+                            'schema_name': masking_config['schema_name'],
+                            'model_name': masking_config['model_name'],
+                            'column_name': masking_config['column_name'],
+                            'grantee': grantee,
+                            'grantee_type': grantee_type
+                        }) %}
+                    {% endif %}
+                {% endfor %}
+            {% endfor %}
+
+            {% if policies_to_attach | length > 0 %}
+                {% set table_column_types = dbt_access_management.get_table_column_types(policies_to_attach) %}
+                {% set attach_statements = [] %}
+                {% for policy_to_attach in policies_to_attach %}
+                    {% set attach_statement = dbt_access_management.get_attach_policies_query([policy_to_attach], table_column_types) | trim %}
+                    {% if attach_statement | length > 0 %}
+                        {% do attach_statements.append(attach_statement) %}
+                    {% endif %}
+                {% endfor %}
+                {% do dbt_access_management.run_statements_in_batches(attach_statements, max_statements_per_batch) %}
+            {% else %}
+                {{ log("All configured masking policies are already attached", info=True) }}
+            {% endif %}
+        {% endif %}
+    {% endif %}
+{% endmacro %}
+
+{% macro get_masking_configs_for_relations(relation_keys) %}
+    {# Returns a masking config of every masked column of relations from relation_keys, from the data masking plan or the config table #}
+    {% set masking_configs = [] %}
+    {% if relation_keys | length == 0 %}
+        {{ return(masking_configs) }}
+    {% endif %}
+
+    {% set data_masking_plan = dbt_access_management.get_data_masking_plan() %}
+    {% if data_masking_plan is not none %}
+        {% for relation_key in relation_keys %}
+            {% set relation_key_parts = relation_key.split('.', 1) %}
+            {% for column_config in data_masking_plan.get(relation_key, []) %}
+                {% do masking_configs.append({
+                    'relation_key': relation_key,
+                    'schema_name': relation_key_parts[0],
+                    'model_name': relation_key_parts[1],
+                    'column_name': column_config['column_name'],
+                    'users_with_access': column_config['users_with_access'],
+                    'roles_with_access': column_config['roles_with_access']
+                }) %}
+            {% endfor %}
+        {% endfor %}
+        {{ return(masking_configs) }}
+    {% endif %}
+
+    {% set relation_conditions = [] %}
+    {% for relation_key in relation_keys %}
+        {% set relation_key_parts = relation_key.split('.', 1) %}
+        {% do relation_conditions.append("('" ~ relation_key_parts[0] ~ "', '" ~ relation_key_parts[1] ~ "')") %}
+    {% endfor %}
+    {% set query_config_table %}
+        select t.schema_name, t.model_name, c.column_name, c.users_with_access, c.roles_with_access
+        from access_management.{{project_name}}_data_masking_config as t, t.masking_config as c
+        where (t.schema_name, t.model_name) in ({{ relation_conditions | join(", ") }});
+    {% endset %}
+    {% for row in dbt.run_query(query_config_table).rows %}
+        {% do masking_configs.append({
+            'relation_key': row.schema_name ~ '.' ~ row.model_name,
+            'schema_name': row.schema_name,
+            'model_name': row.model_name,
+            'column_name': fromjson(row.column_name),
+            'users_with_access': fromjson(row.users_with_access),
+            'roles_with_access': fromjson(row.roles_with_access)
+        }) %}
+    {% endfor %}
+    {{ return(masking_configs) }}
+{% endmacro %}
+
+{% macro get_attached_masking_policies(relation_keys) %}
+    {% set attached_policies = [] %}
+    {% if relation_keys | length == 0 %}
+        {{ return(attached_policies) }}
+    {% endif %}
+    {% set query_system_table %}
+        select * from svv_attached_masking_policy
+        where (schema_name || '.' || table_name) in ({{ "'" ~ relation_keys | join("', '") ~ "'" }});
+    {% endset %}
+    {% for row in dbt.run_query(query_system_table).rows %}
+        {% do attached_policies.append({
+            'schema_name': row.schema_name,
+            'model_name': row.table_name,
+            'column_name': fromjson(row.input_columns)[0],
+            'grantee': row.grantee,
+            'grantee_type': row.grantee_type
+        }) %}
+    {% endfor %}
+    {{ return(attached_policies) }}
+{% endmacro %}
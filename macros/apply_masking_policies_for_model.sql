@@ -1,62 +1,66 @@
 {% macro apply_masking_policies_for_model() %}
     {% if execute %}
+        {% set planned_masking_configs = dbt_access_management.get_planned_masking_configs_for_model() %}
+        {% if planned_masking_configs is not none and planned_masking_configs | length == 0 %}
+            {{ log("No masking configured for " ~ this.schema ~ "." ~ this.name, info=True) }}
+        {% else %}
+            {% if config.get('materialized') == 'snapshot' %}
+                {% set snapshot_table_policies_existed_before_run = dbt_access_management.check_model_has_masking_policies_attached(this.schema, this.name ) %}
+            {% else %} {% set snapshot_table_policies_existed_before_run = false %}
+            {% endif %}
 
-        {% if config.get('materialized') == 'snapshot' %}
-            {% set snapshot_table_policies_existed_before_run = dbt_access_management.check_model_has_masking_policies_attached(this.schema, this.name ) %}
-        {% else %} {% set snapshot_table_policies_existed_before_run = false %}
-        {% endif %}
-
-        {% if config.get('materialized') == 'ephemeral' %}
-            {{ log("Skipping attaching masking policies for " ~ this.name ~ " ephemeral model", info=True) }}
-        {% elif snapshot_table_policies_existed_before_run %}
-            {{ log("Skipping attaching masking policies for snapshot table: " ~ this.name ~ ", because masking policies are already applied.", info=True) }}
-        {% elif config.get('materialized') in ['table', 'view'] or ('incremental' in config.get('materialized') and flags.FULL_REFRESH)
-            or (config.get('materialized') == 'seed' and flags.FULL_REFRESH)
-            or (config.get('materialized') == 'snapshot' and snapshot_table_policies_existed_before_run == false) %}
-            {% set database_identities = dbt_access_management.get_database_identities() %}
-            {% set users_identities = dbt_access_management.get_users(database_identities) %}
-            {% set roles_identities = dbt_access_management.get_roles(database_identities) %}
-            {% set masking_configs =  dbt_access_management.get_masking_configs_for_model() %}
-            {% set columns = adapter.get_columns_in_relation(this) %}
-            {% set configure_masking_query -%}
-                {%- for masking_config in masking_configs -%}
-                    {%- for col in columns -%}
-                        {%- if col.quoted == masking_config['column_name'] -%}
-                            {% set masking_policies = dbt_access_management.get_masking_policy_for_data_type(col.name, col.data_type) %}
-                            {%- if masking_policies['masking_policy'] is not none and masking_policies['unmasking_policy'] is not none -%}
-                                ATTACH MASKING POLICY {{ masking_policies['masking_policy'] }}
-                                ON {{ this.schema }}.{{ this.name }}({{ masking_config['column_name'] }})
-                                TO PUBLIC;
-                                {{ '\n' -}}
-                                {%- for user in fromjson(masking_config['users_with_access']) -%}
-                                {%- if user in users_identities -%}
-                                ATTACH MASKING POLICY {{ masking_policies['unmasking_policy'] }}
-                                ON {{ this.schema }}.{{ this.name }}({{ masking_config['column_name'] }})
-                                TO "{{ user }}" PRIORITY 10;
-                                {{ '\n' -}}
-                                {%- endif -%}
-                                {%- endfor -%}
-                                {%- for role in fromjson(masking_config['roles_with_access']) -%}
-                                {%- if role in roles_identities -%}
-                                ATTACH MASKING POLICY {{ masking_policies['unmasking_policy'] }}
-                                ON {{ this.schema }}.{{ this.name }}({{ masking_config['column_name'] }})
-                                TO ROLE "{{ role }}" PRIORITY 10;
-                                {{ '\n' -}}
+            {% if config.get('materialized') == 'ephemeral' %}
+                {{ log("Skipping attaching masking policies for " ~ this.name ~ " ephemeral model", info=True) }}
+            {% elif snapshot_table_policies_existed_before_run %}
+                {{ log("Skipping attaching masking policies for snapshot table: " ~ this.name ~ ", because masking policies are already applied.", info=True) }}
+            {% elif config.get('materialized') in ['table', 'view'] or ('incremental' in config.get('materialized') and flags.FULL_REFRESH)
+                or (config.get('materialized') == 'seed' and flags.FULL_REFRESH)
+                or (config.get('materialized') == 'snapshot' and snapshot_table_policies_existed_before_run == false) %}
+                {% set database_identities = dbt_access_management.get_run_database_identities() %}
+                {% set users_identities = dbt_access_management.get_users(database_identities) %}
+                {% set roles_identities = dbt_access_management.get_roles(database_identities) %}
+                {% set masking_configs = planned_masking_configs if planned_masking_configs is not none else dbt_access_management.get_masking_configs_for_model() %}
+                {% set columns = adapter.get_columns_in_relation(this) %}
+                {% set configure_masking_query -%}
+                    {%- for masking_config in masking_configs -%}
+                        {%- for col in columns -%}
+                            {%- if col.name == masking_config['column_name'] -%}
+                                {% set masking_policies = dbt_access_management.get_masking_policy_for_data_type(col.name, col.data_type) %}
+                                {%- if masking_policies['masking_policy'] is not none and masking_policies['unmasking_policy'] is not none -%}
+                                    ATTACH MASKING POLICY {{ masking_policies['masking_policy'] }}
+                                    ON {{ this.schema }}.{{ this.name }}("{{ masking_config['column_name'] }}")
+                                    TO PUBLIC;
+                                    {{ '\n' -}}
+                                    {%- for user in masking_config['users_with_access'] -%}
+                                    {%- if user in users_identities -%}
+                                    ATTACH MASKING POLICY {{ masking_policies['unmasking_policy'] }}
+                                    ON {{ this.schema }}.{{ this.name }}("{{ masking_config['column_name'] }}")
+                                    TO "{{ user }}" PRIORITY 10;
+                                    {{ '\n' -}}
+                                    {%- endif -%}
+                                    {%- endfor -%}
+                                    {%- for role in masking_config['roles_with_access'] -%}
+                                    {%- if role in roles_identities -%}
+                                    ATTACH MASKING POLICY {{ masking_policies['unmasking_policy'] }}
+                                    ON {{ this.schema }}.{{ this.name }}("{{ masking_config['column_name'] }}")
+                                    TO ROLE "{{ role }}" PRIORITY 10;
+                                    {{ '\n' -}}
+                                    {%- endif -%}
+                                    {%- endfor -%}
                                 {%- endif -%}
-                                {%- endfor -%}
                             {%- endif -%}
-                        {%- endif -%}
+                        {%- endfor -%}
                     {%- endfor -%}
-                {%- endfor -%}
-            {%- endset %}
-            {% if configure_masking_query %}
-                {{ log(configure_masking_query, info=True) }}
-                {% do dbt.run_query(configure_masking_query) %}
+                {%- endset %}
+                {% if configure_masking_query %}
+                    {{ log(configure_masking_query, info=True) }}
+                    {% do dbt.run_query(configure_masking_query) %}
+                {% else %}
+                    {{ log("No masking configured for " ~ this.schema ~ "." ~ this.name, info=True) }}
+                {% endif %}
             {% else %}
-                {{ log("No masking configured for " ~ this.schema ~ "." ~ this.name, info=True) }}
+                {{ log("Skipping assigning masking policies for incremental run", info=False) }}
             {% endif %}
-        {% else %}
-            {{ log("Skipping assigning masking policies for incremental run", info=False) }}
         {% endif %}
     {% endif %}
 {% endmacro %}
@@ -64,8 +68,7 @@
 {% macro get_masking_configs_for_model() %}
     {% set query_config_table %}
         select c.column_name, c.users_with_access, c.roles_with_access from access_management.{{project_name}}_data_masking_config  as t, t.masking_config as c
-        where schema_name = '{{ this.schema }}' and model_name = '{{ this.name }}'
-        and created_timestamp = (select max(created_timestamp) from access_management.{{project_name}}_data_masking_config);
+        where schema_name = '{{ this.schema }}' and model_name = '{{ this.name }}';
     {% endset %}
 
     {% set query_config_table_result = dbt.run_query(query_config_table) %}
@@ -73,10 +76,59 @@
 
     {% for row in query_config_table_result.rows %}
         {% do masking_config.append({
-            'column_name': row.column_name,
-            'users_with_access': row.users_with_access,
-            'roles_with_access': row.roles_with_access
+            'column_name': fromjson(row.column_name),
+            'users_with_access': fromjson(row.users_with_access),
+            'roles_with_access': fromjson(row.roles_with_access)
         }) %}
     {% endfor %}
     {{ return(masking_config) }}
 {% endmacro %}
+
+{% macro get_data_masking_plan() %}
+    {#
+        The data masking plan holds masking configs of all masked models keyed by schema.model.
+        dbt-am configure hands small plans to the dbt command in the DBT_AM_DATA_MASKING_PLAN environment variable,
+        otherwise the plan is loaded from the config table with a single query.
+        The plan is kept in the graph, which is shared by all nodes of the run.
+        Returns none when there is no plan.
+    #}
+    {% if 'dbt_access_management_data_masking_plan' not in graph %}
+        {% set data_masking_plan = env_var('DBT_AM_DATA_MASKING_PLAN', '') %}
+        {% do graph.update({'dbt_access_management_data_masking_plan': fromjson(data_masking_plan) if data_masking_plan else dbt_access_management.load_data_masking_plan()}) %}
+    {% endif %}
+    {{ return(graph['dbt_access_management_data_masking_plan']) }}
+{% endmacro %}
+
+{% macro load_data_masking_plan() %}
+    {% set config_table_name = project_name ~ '_data_masking_config' %}
+    {% if dbt_access_management.get_config_table_created_timestamp(config_table_name) is none %}
+        {{ return(none) }}
+    {% endif %}
+    {% set query_config_table %}
+        select t.schema_name, t.model_name, c.column_name, c.users_with_access, c.roles_with_access
+        from access_management.{{ config_table_name }} as t, t.masking_config as c;
+    {% endset %}
+
+    {% set data_masking_plan = {} %}
+    {% for row in dbt.run_query(query_config_table).rows %}
+        {% set relation_key = row.schema_name ~ '.' ~ row.model_name %}
+        {% if relation_key not in data_masking_plan %}
+            {% do data_masking_plan.update({relation_key: []}) %}
+        {% endif %}
+        {% do data_masking_plan[relation_key].append({
+            'column_name': fromjson(row.column_name),
+            'users_with_access': fromjson(row.users_with_access),
+            'roles_with_access': fromjson(row.roles_with_access)
+        }) %}
+    {% endfor %}
+    {{ return(data_masking_plan) }}
+{% endmacro %}
+
+{% macro get_planned_masking_configs_for_model() %}
+    {# Returns masking configs of the current model, an empty list for unmasked models or none when there is no plan #}
+    {% set data_masking_plan = dbt_access_management.get_data_masking_plan() %}
+    {% if data_masking_plan is none %}
+        {{ return(none) }}
+    {% endif %}
+    {{ return(data_masking_plan.get(this.schema ~ '.' ~ this.name, [])) }}
+{% endmacro %}
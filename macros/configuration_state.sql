@@ -0,0 +1,38 @@
+{% macro is_configuration_state_applied(config_table_name, state_hash) %}
+    {#
+        The state hash is computed by dbt-am CLI from all rows of the configuration table.
+        The configuration is applied when the last configuration saved the same hash
+        and the configuration table still exists.
+    #}
+    {% set configuration_state_table_query %}
+        SELECT * FROM information_schema.tables WHERE table_schema = 'access_management' and table_name = 'dbt_am_configuration_state';
+    {% endset %}
+    {% if run_query(configuration_state_table_query).rows | length == 0 %}
+        {{ return(false) }}
+    {% endif %}
+
+    {% set applied_state_hash_query %}
+        SELECT state_hash FROM access_management.dbt_am_configuration_state
+        WHERE config_table_name = '{{config_table_name}}';
+    {% endset %}
+    {% set applied_state_hash_rows = run_query(applied_state_hash_query).rows %}
+    {% if applied_state_hash_rows | length == 0 or applied_state_hash_rows[0].state_hash != state_hash %}
+        {{ return(false) }}
+    {% endif %}
+    {{ return(get_config_table_created_timestamp(config_table_name) is not none) }}
+{% endmacro %}
+
+{% macro save_configuration_state(config_table_name, state_hash) %}
+    {% set save_configuration_state_query %}
+        CREATE SCHEMA IF NOT EXISTS access_management;
+        CREATE TABLE IF NOT EXISTS access_management.dbt_am_configuration_state (
+            config_table_name VARCHAR(256),
+            state_hash VARCHAR(64),
+            applied_timestamp TIMESTAMP
+        );
+        DELETE FROM access_management.dbt_am_configuration_state WHERE config_table_name = '{{config_table_name}}';
+        INSERT INTO access_management.dbt_am_configuration_state (config_table_name, state_hash, applied_timestamp)
+        VALUES ('{{config_table_name}}', '{{state_hash}}', GETDATE());
+    {% endset %}
+    {% do run_query(save_configuration_state_query) %}
+{% endmacro %}
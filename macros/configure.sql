@@ -1,17 +1,22 @@
 {% macro configure(
     temp_access_management_config_table_name,
     config_access_management_table_name,
-    create_temp_access_management_config_table_query,
-    create_access_management_config_table_query,
     temp_data_masking_config_table_name,
     config_data_masking_table_name,
-    create_temp_data_masking_config_table_query,
-    create_data_masking_config_table_query
+    create_temp_access_management_config_table_query=none,
+    create_access_management_config_table_query=none,
+    create_temp_data_masking_config_table_query=none,
+    create_data_masking_config_table_query=none,
+    previous_access_management_config_created_timestamp=none,
+    previous_data_masking_config_created_timestamp=none,
+    access_management_state_hash=none,
+    data_masking_state_hash=none,
+    configured_identities=none
 ) %}
     {{ log("Configuring access management and data masking", info=True) }}
-    {% do configure_access_management(temp_access_management_config_table_name, config_access_management_table_name, create_temp_access_management_config_table_query, create_access_management_config_table_query) %}
+    {% do configure_access_management(temp_access_management_config_table_name, config_access_management_table_name, create_temp_access_management_config_table_query, create_access_management_config_table_query, previous_access_management_config_created_timestamp, access_management_state_hash, configured_identities) %}
     {{ log("Access management configured", info=True) }}
-    {% do configure_data_masking(temp_data_masking_config_table_name, config_data_masking_table_name, create_temp_data_masking_config_table_query, create_data_masking_config_table_query) %}
+    {% do configure_data_masking(temp_data_masking_config_table_name, config_data_masking_table_name, create_temp_data_masking_config_table_query, create_data_masking_config_table_query, previous_data_masking_config_created_timestamp, data_masking_state_hash) %}
     {{ log("Data masking configured", info=True) }}
 
 {% endmacro %}
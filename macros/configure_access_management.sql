@@ -1,18 +1,23 @@
-{% macro configure_access_management(temp_access_management_config_table_name, config_access_management_table_name, create_temp_access_management_config_table_query, create_access_management_config_table_query) %}
-    {{ log("Creating temporary access config table " ~ temp_access_management_config_table_name, info=True) }}
-    {% do run_query(create_temp_access_management_config_table_query) %}
-    {% do validate_configured_identities(config_table_name=temp_access_management_config_table_name, should_stop_execution=True) %}
-    {% set objects_in_database = get_objects_in_database() %}
+{% macro configure_access_management(temp_access_management_config_table_name, config_access_management_table_name, create_temp_access_management_config_table_query=none, create_access_management_config_table_query=none, previous_access_management_config_created_timestamp=none, access_management_state_hash=none, configured_identities=none) %}
+    {% if access_management_state_hash and is_configuration_state_applied(config_access_management_table_name, access_management_state_hash) %}
+        {{ log("Access management configuration has not changed since the last configuration, skipping", info=True) }}
+        {{ return(none) }}
+    {% endif %}
+    {% do create_temp_config_table(temp_access_management_config_table_name, config_access_management_table_name, create_temp_access_management_config_table_query, previous_access_management_config_created_timestamp) %}
+    {% do validate_configured_identities(config_table_name=temp_access_management_config_table_name, should_stop_execution=True, configured_identities=configured_identities) %}
+    {% set staged_objects_table_name = stage_objects_in_database([temp_access_management_config_table_name, config_access_management_table_name]) %}
     {% set database_identities = get_database_identities() %}
-    {% set new_unique_grants_and_revokes = get_grants_and_revokes(objects_in_database, temp_access_management_config_table_name, database_identities) %}
+    {% set new_unique_grants_and_revokes = get_grants_and_revokes(staged_objects_table_name, temp_access_management_config_table_name, database_identities) %}
     {% set new_unique_grants = new_unique_grants_and_revokes['unique_grants'] %}
     {% set new_unique_revokes = new_unique_grants_and_revokes['unique_revokes'] %}
-    {% set previous_unique_grants_and_revokes = get_grants_and_revokes(objects_in_database, config_access_management_table_name, database_identities, True) %}
+    {% set previous_unique_grants_and_revokes = get_grants_and_revokes(staged_objects_table_name, config_access_management_table_name, database_identities, True) %}
     {% set previous_unique_grants = previous_unique_grants_and_revokes['unique_grants'] %}
     {% set previous_unique_revokes = previous_unique_grants_and_revokes['unique_revokes'] %}
 
     {% set revokes_to_execute = get_previous_revokes_which_do_not_exist_in_new_config(new_unique_revokes, previous_unique_revokes) %}
     {% set grants_to_execute = get_new_grants_which_do_not_exist_in_previous_config(new_unique_grants, previous_unique_grants) %}
+    {% set revokes_to_execute = consolidate_statements(revokes_to_execute) %}
+    {% set grants_to_execute = consolidate_statements(grants_to_execute) %}
 
     {% if (revokes_to_execute | length) > 0 or (grants_to_execute | length) > 0 %}
         {% set execute_revokes_and_grants_query %}
@@ -32,19 +37,31 @@
             DROP TABLE access_management.{{config_access_management_table_name}};
         {% endset %}
         {% do run_query(drop_configuration_table_query) %}
+    {% else %}
+        {# ALTER DISTSTYLE can't run in a transaction block, so every statement is run on its own #}
+        {% for layout_change in get_configuration_table_layout_changes('access_management', temp_access_management_config_table_name, config_access_management_table_name) %}
+            {{ log("Changing layout of " ~ config_access_management_table_name ~ ": " ~ layout_change, info=True) }}
+            {% do run_query(layout_change) %}
+        {% endfor %}
     {% endif %}
+    {# All rows of the config table are replaced in one transaction, so it holds only the current configuration #}
+    {{ log("Replacing rows of " ~ config_access_management_table_name ~ " with rows of " ~ temp_access_management_config_table_name, info=True) }}
     {% do run_query(create_access_management_config_table_query) %}
     {% set drop_temp_config_access_management_table_query %}
         DROP TABLE access_management.{{temp_access_management_config_table_name}};
     {% endset %}
     {{ log(drop_temp_config_access_management_table_query, info=True) }}
     {% do run_query(drop_temp_config_access_management_table_query) %}
+    {% if access_management_state_hash %}
+        {% do save_configuration_state(config_access_management_table_name, access_management_state_hash) %}
+    {% endif %}
 
 {% endmacro %}
 
-{% macro get_grants_and_revokes(objects_in_database, config_access_management_table_name, database_identities, should_check_if_config_table_exits=True) %}
+{% macro get_grants_and_revokes(staged_objects_table_name, config_access_management_table_name, database_identities, should_check_if_config_table_exits=True) %}
     {% set unique_grants = [] %}
     {% set unique_revokes = [] %}
+    {% set seen_statements = {} %}
 
     {% if should_check_if_config_table_exits %}
         {% set query %}
@@ -68,12 +85,10 @@
     {% if database_identities | length > 0 %}
         {% set identities_in_clause = identity_conditions | join(", ") %}
         {% set query_config_table %}
-        SELECT json_parse(grants::varchar) as grants, json_parse(revokes::varchar) as revokes
-        FROM access_management.{{config_access_management_table_name}}
-        WHERE database_name || '.' || schema_name || '.' || model_name || '.' ||  CASE
-            WHEN lower(materialization) = 'view' THEN 'view'  ELSE 'table' END
-        IN ({{ "'" ~ objects_in_database | join("', '") ~ "'" }})
-        AND (identity_type, identity_name) IN ({{ identities_in_clause }});
+        SELECT json_parse(c.grants::varchar) as grants, json_parse(c.revokes::varchar) as revokes
+        FROM access_management.{{config_access_management_table_name}} AS c
+        WHERE {{ get_object_in_database_condition(staged_objects_table_name, 'c') }}
+        AND (c.identity_type, c.identity_name) IN ({{ identities_in_clause }});
         {% endset %}
 
         {% set grants_and_revokes = run_query(query_config_table) %}
@@ -82,12 +97,14 @@
                 {% set grants_list = fromjson(row.grants) %}
                 {% set revokes_list = fromjson(row.revokes) %}
                 {% for grant_query in grants_list %}
-                    {% if grant_query not in unique_grants %}
+                    {% if grant_query not in seen_statements %}
+                        {% do seen_statements.update({grant_query: true}) %}
                         {% do unique_grants.append(grant_query) %}
                     {% endif %}
                 {% endfor %}
                 {% for revoke_query in revokes_list %}
-                    {% if revoke_query not in unique_revokes %}
+                    {% if revoke_query not in seen_statements %}
+                        {% do seen_statements.update({revoke_query: true}) %}
                         {% do unique_revokes.append(revoke_query) %}
                     {% endif %}
                 {% endfor %}
@@ -112,8 +129,12 @@
 
 {% macro get_previous_revokes_which_do_not_exist_in_new_config(new_unique_revokes, previous_unique_revokes) %}
     {% set revokes_to_execute = [] %}
+    {% set new_revokes_lookup = {} %}
+    {% for revoke in new_unique_revokes %}
+        {% do new_revokes_lookup.update({revoke: true}) %}
+    {% endfor %}
     {% for revoke in previous_unique_revokes %}
-        {% if revoke not in new_unique_revokes %}
+        {% if revoke not in new_revokes_lookup %}
             {% do revokes_to_execute.append(revoke) %}
         {% endif %}
     {% endfor %}
@@ -123,8 +144,12 @@
 
 {% macro get_new_grants_which_do_not_exist_in_previous_config(new_unique_grants, previous_unique_grants) %}
     {% set grants_to_execute = [] %}
+    {% set previous_grants_lookup = {} %}
+    {% for grant in previous_unique_grants %}
+        {% do previous_grants_lookup.update({grant: true}) %}
+    {% endfor %}
     {% for grant in new_unique_grants %}
-        {% if grant not in previous_unique_grants %}
+        {% if grant not in previous_grants_lookup %}
             {% do grants_to_execute.append(grant) %}
         {% endif %}
     {% endfor %}
@@ -1,15 +1,18 @@
-{% macro configure_data_masking(temp_data_masking_config_table_name, config_data_masking_table_name, create_temp_data_masking_config_table_query, create_data_masking_config_table_query) %}
+{% macro configure_data_masking(temp_data_masking_config_table_name, config_data_masking_table_name, create_temp_data_masking_config_table_query=none, create_data_masking_config_table_query=none, previous_data_masking_config_created_timestamp=none, data_masking_state_hash=none) %}
+    {% if data_masking_state_hash and is_configuration_state_applied(config_data_masking_table_name, data_masking_state_hash) %}
+        {{ log("Data masking configuration has not changed since the last configuration, skipping", info=True) }}
+        {{ return(none) }}
+    {% endif %}
     {% set detach_policies_query = '' %}
     {% set attach_policies_query = '' %}
 
-    {{ log("Creating temporary dynamic data masking config table " ~ temp_data_masking_config_table_name, info=True) }}
-    {% do run_query(create_temp_data_masking_config_table_query) %}
+    {% do create_temp_config_table(temp_data_masking_config_table_name, config_data_masking_table_name, create_temp_data_masking_config_table_query, previous_data_masking_config_created_timestamp) %}
 
     {% do create_project_related_masking_policies() %}
-    {% set objects_in_database = get_objects_in_database() %}
+    {% set staged_objects_table_name = stage_objects_in_database([temp_data_masking_config_table_name]) %}
     {% set database_identities = get_database_identities() %}
     {% set currently_applied_masking_configs = get_currently_applied_masking_configs_for_objects_from_new_config(temp_data_masking_config_table_name) %}
-    {% set new_masking_configs = get_new_masking_configs(temp_data_masking_config_table_name, objects_in_database) %}
+    {% set new_masking_configs = get_new_masking_configs(temp_data_masking_config_table_name, staged_objects_table_name) %}
     {% set new_masking_configs_in_format_of_system_table = map_new_configs_to_system_table_format(new_masking_configs) %}
     {% set policies_to_detach = get_policies_to_detach(currently_applied_masking_configs, new_masking_configs_in_format_of_system_table) %}
     {% set policies_to_attach = get_policies_to_attach(currently_applied_masking_configs, new_masking_configs_in_format_of_system_table) %}
@@ -37,13 +40,24 @@
             DROP TABLE access_management.{{config_data_masking_table_name}};
         {% endset %}
         {% do run_query(drop_configuration_table_query) %}
+    {% else %}
+        {# ALTER DISTSTYLE can't run in a transaction block, so every statement is run on its own #}
+        {% for layout_change in get_configuration_table_layout_changes('access_management', temp_data_masking_config_table_name, config_data_masking_table_name) %}
+            {{ log("Changing layout of " ~ config_data_masking_table_name ~ ": " ~ layout_change, info=True) }}
+            {% do run_query(layout_change) %}
+        {% endfor %}
     {% endif %}
+    {# All rows of the config table are replaced in one transaction, so it holds only the current configuration #}
+    {{ log("Replacing rows of " ~ config_data_masking_table_name ~ " with rows of " ~ temp_data_masking_config_table_name, info=True) }}
     {% do run_query(create_data_masking_config_table_query) %}
     {% set drop_temp_config_data_masking_table_query %}
         DROP TABLE access_management.{{temp_data_masking_config_table_name}};
     {% endset %}
     {{ log(drop_temp_config_data_masking_table_query, info=True) }}
     {% do run_query(drop_temp_config_data_masking_table_query) %}
+    {% if data_masking_state_hash %}
+        {% do save_configuration_state(config_data_masking_table_name, data_masking_state_hash) %}
+    {% endif %}
 {% endmacro %}
 
 {% macro get_currently_applied_masking_configs_for_objects_from_new_config(temp_data_masking_config_table_name) %}
@@ -80,13 +94,11 @@
     {{ return(masking_configs) }}
 {% endmacro %}
 
-{% macro get_new_masking_configs(temp_data_masking_config_table_name, objects_in_database) %}
+{% macro get_new_masking_configs(temp_data_masking_config_table_name, staged_objects_table_name) %}
     {% set query_config_table %}
         select t.schema_name, t.model_name, c.column_name, c.users_with_access, c.roles_with_access
         from access_management.{{ temp_data_masking_config_table_name }} as t, t.masking_config as c
-        where t.database_name || '.' || t.schema_name || '.' || t.model_name || '.' ||  case
-            when lower(t.materialization) = 'view' then 'view'  else 'table' end
-        in ({{ "'" ~ objects_in_database | join("', '") ~ "'" }});
+        where {{ get_object_in_database_condition(staged_objects_table_name, 't') }};
     {% endset %}
 
     {% set query_config_table_result = dbt.run_query(query_config_table) %}
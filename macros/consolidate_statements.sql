@@ -0,0 +1,54 @@
+{% macro consolidate_statements(statements, max_objects_per_statement=100) %}
+    {#
+        Merges grant and revoke statements generated by dbt-am, e.g.
+            GRANT SELECT ON staging.user TO "user_1";
+            GRANT SELECT ON staging.order TO "user_1";
+            GRANT SELECT ON staging.user TO ROLE "role_1";
+            GRANT SELECT ON staging.order TO ROLE "role_1";
+        into
+            GRANT SELECT ON staging.user, staging.order TO "user_1", ROLE "role_1";
+        First objects with the same privilege are collected for every grantee,
+        then grantees with the same privilege on the same objects are merged.
+        Objects are sorted before they are split into batches, so grantees with the same objects
+        are merged regardless of the order of their statements.
+        Statements in other format are returned unchanged after the merged ones.
+    #}
+    {% set objects_per_grantee = {} %}
+    {% set other_statements = [] %}
+
+    {% for statement in statements %}
+        {% set statement_parts = statement.strip().rstrip(';').split(' ON ', 1) %}
+        {% set action = statement_parts[0] %}
+        {% set keyword = ' FROM ' if action.startswith('REVOKE ') else ' TO ' %}
+        {% set target_parts = statement_parts[1].split(keyword, 1) if statement_parts | length == 2 else [] %}
+        {% if target_parts | length == 2 %}
+            {% set object_type = 'SCHEMA ' if target_parts[0].startswith('SCHEMA ') else '' %}
+            {% set object_name = target_parts[0][object_type | length:] %}
+            {% set grantee_key = (action, object_type, keyword, target_parts[1]) %}
+            {% if grantee_key not in objects_per_grantee %}
+                {% do objects_per_grantee.update({grantee_key: {}}) %}
+            {% endif %}
+            {% do objects_per_grantee[grantee_key].update({object_name: true}) %}
+        {% else %}
+            {% do other_statements.append(statement) %}
+        {% endif %}
+    {% endfor %}
+
+    {% set grantees_per_objects = {} %}
+    {% for grantee_key, objects in objects_per_grantee.items() %}
+        {% for objects_batch in objects.keys() | sort | batch(max_objects_per_statement) %}
+            {% set objects_key = (grantee_key[0], grantee_key[1], grantee_key[2], objects_batch | join(', ')) %}
+            {% if objects_key not in grantees_per_objects %}
+                {% do grantees_per_objects.update({objects_key: []}) %}
+            {% endif %}
+            {% do grantees_per_objects[objects_key].append(grantee_key[3]) %}
+        {% endfor %}
+    {% endfor %}
+
+    {% set consolidated_statements = [] %}
+    {% for objects_key, grantees in grantees_per_objects.items() %}
+        {% do consolidated_statements.append(objects_key[0] ~ ' ON ' ~ objects_key[1] ~ objects_key[3] ~ objects_key[2] ~ grantees | join(', ') ~ ';') %}
+    {% endfor %}
+
+    {{ return(consolidated_statements + other_statements) }}
+{% endmacro %}
@@ -0,0 +1,31 @@
+{% macro create_temp_config_table(temp_config_table_name, config_table_name, create_temp_config_table_query, previous_config_created_timestamp=none) %}
+    {#
+        An incremental query, passed with the timestamp of the rows it was built from, copies unchanged rows
+        from the configuration table and inserts only changed rows. The CLI builds it only when the table held
+        the rows of its local snapshot, so the configuration fails if the rows were replaced in the meantime.
+    #}
+    {% if previous_config_created_timestamp %}
+        {% if get_config_table_created_timestamp(config_table_name) != previous_config_created_timestamp %}
+            {{ exceptions.raise_compiler_error("Rows of " ~ config_table_name ~ " were replaced since " ~ previous_config_created_timestamp ~ ", run the configuration again") }}
+        {% endif %}
+        {{ log("Creating temporary config table " ~ temp_config_table_name ~ " from rows changed since " ~ previous_config_created_timestamp, info=True) }}
+    {% else %}
+        {{ log("Creating temporary config table " ~ temp_config_table_name, info=True) }}
+    {% endif %}
+    {% do run_query(create_temp_config_table_query) %}
+{% endmacro %}
+
+{% macro get_config_table_created_timestamp(config_table_name) %}
+    {% set config_table_query %}
+        SELECT * FROM information_schema.tables WHERE table_schema = 'access_management' and table_name = '{{config_table_name}}';
+    {% endset %}
+    {% if run_query(config_table_query).rows | length == 0 %}
+        {{ return(none) }}
+    {% endif %}
+
+    {% set created_timestamp_query %}
+        SELECT TO_CHAR(MAX(created_timestamp), 'YYYY-MM-DD HH24:MI:SS') AS created_timestamp
+        FROM access_management.{{config_table_name}};
+    {% endset %}
+    {{ return(run_query(created_timestamp_query).rows[0].created_timestamp) }}
+{% endmacro %}
@@ -1,5 +1,5 @@
 {% macro execute_grants_for_configured_identities() %}
-    {% set objects_in_database = get_objects_in_database() %}
+    {% set staged_objects_table_name = stage_objects_in_database([project_name ~ '_access_management_config']) %}
 
     {% set database_identities = get_database_identities() %}
 
@@ -12,28 +12,28 @@
     {% if database_identities | length > 0 %}
         {% set identities_in_clause = identity_conditions | join(", ") %}
         {% set query_config_table %}
-        SELECT json_parse(grants::varchar) as grants
-        FROM access_management.{{project_name}}_access_management_config
-        WHERE database_name || '.' || schema_name || '.' || model_name || '.' ||  CASE
-            WHEN lower(materialization) = 'view' THEN 'view'  ELSE 'table' END
-        IN ({{ "'" ~ objects_in_database | join("', '") ~ "'" }})
-        AND (identity_type, identity_name) IN ({{ identities_in_clause }});
+        SELECT json_parse(c.grants::varchar) as grants
+        FROM access_management.{{project_name}}_access_management_config AS c
+        WHERE {{ get_object_in_database_condition(staged_objects_table_name, 'c') }}
+        AND (c.identity_type, c.identity_name) IN ({{ identities_in_clause }});
         {% endset %}
 
         {% set unique_grants = [] %}
+        {% set seen_grants = {} %}
 
         {% set grants_result = run_query(query_config_table) %}
         {% if grants_result %}
             {% for row in grants_result.rows %}
                 {% set grants_list = fromjson(row.grants) %}
                 {% for grant_query in grants_list %}
-                    {% if grant_query not in unique_grants %}
+                    {% if grant_query not in seen_grants %}
+                        {% do seen_grants.update({grant_query: true}) %}
                         {% do unique_grants.append(grant_query) %}
                     {% endif %}
                 {% endfor %}
             {% endfor %}
 
-            {% set grant_query = unique_grants | join('\n') %}
+            {% set grant_query = consolidate_statements(unique_grants) | join('\n') %}
 
             {{ log(grant_query, info=True) }}
             {% set result = run_query(grant_query) %}
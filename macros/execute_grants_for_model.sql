@@ -1,6 +1,11 @@
 {% macro execute_grants_for_model() %}
     {% if execute %}
-        {% if config.get('materialized') != 'ephemeral' %}
+        {% set prefetched_grants = dbt_access_management.get_prefetched_grants_for_model() %}
+        {% if config.get('materialized') == 'ephemeral' %}
+            {{ log("Skipping assigning permissions for ephemeral model", info=False) }}
+        {% elif prefetched_grants is not none %}
+            {% do dbt_access_management.execute_grants(dbt_access_management.get_missing_grants(prefetched_grants)) %}
+        {% else %}
             {% set database_identities = dbt_access_management.get_database_identities() %}
 
             {% set identity_conditions = [] %}
@@ -16,8 +21,7 @@
             FROM access_management.{{project_name}}_access_management_config
             WHERE schema_name = '{{ this.schema }}'
             AND model_name = '{{ this.name }}'
-            AND (identity_type, identity_name) IN ({{ identities_in_clause }})
-            AND created_timestamp = (SELECT MAX(created_timestamp) FROM access_management.{{project_name}}_access_management_config);
+            AND (identity_type, identity_name) IN ({{ identities_in_clause }});
                 {% endset %}
 
                 {% set query_config_table_result = dbt.run_query(query_config_table) %}
@@ -36,19 +40,20 @@
                     {% endfor %}
                 {% endfor %}
 
-                {% if all_grants_for_a_model %}
-                    {% set all_grants_query = all_grants_for_a_model | join('\n') %}
-                    {% set log_message = 'Executing grants:\n' ~ all_grants_query ~ '\n for ' ~ this.schema ~ '.' ~ this.name %}
-                    {{ log(log_message, info=True) }}
-                    {% do dbt.run_query(all_grants_query) %}
-                {% else %} {{ log("No grants to execute.", info=True) }}
-                {% endif %}
+                {% do dbt_access_management.execute_grants(all_grants_for_a_model) %}
             {% else %}
                 {{ log("No identities found; skipping grants execution.", info=True) }}
             {% endif %}
-
-        {% else %}
-            {{ log("Skipping assigning permissions for ephemeral model", info=False) }}
         {% endif %}
     {% endif %}
 {% endmacro %}
+
+{% macro execute_grants(grants) %}
+    {% if grants %}
+        {% set all_grants_query = dbt_access_management.consolidate_statements(grants) | join('\n') %}
+        {% set log_message = 'Executing grants:\n' ~ all_grants_query ~ '\n for ' ~ this.schema ~ '.' ~ this.name %}
+        {{ log(log_message, info=True) }}
+        {% do dbt.run_query(all_grants_query) %}
+    {% else %} {{ log("No grants to execute.", info=True) }}
+    {% endif %}
+{% endmacro %}
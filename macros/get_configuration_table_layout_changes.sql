@@ -0,0 +1,57 @@
+{% macro get_configuration_table_layout_changes(schema_name, temp_configuration_table_name, configuration_table_name) %}
+    {#
+        The temporary configuration table is created with the configured distribution style and sort key,
+        so statements altering the configuration table to its layout are returned when the layouts differ.
+        Rows of the configuration table are replaced instead of dropping the table, so otherwise it would keep
+        the layout it was created with.
+    #}
+    {% set configuration_table_layout = get_configuration_table_layout(schema_name, configuration_table_name) %}
+    {% set temp_configuration_table_layout = get_configuration_table_layout(schema_name, temp_configuration_table_name) %}
+    {% set layout_changes = [] %}
+
+    {% if configuration_table_layout is none or temp_configuration_table_layout is none %}
+        {{ return(layout_changes) }}
+    {% endif %}
+
+    {% if configuration_table_layout['dist_style'] != temp_configuration_table_layout['dist_style'] %}
+        {% do layout_changes.append('ALTER TABLE ' ~ schema_name ~ '.' ~ configuration_table_name ~ ' ALTER DISTSTYLE ' ~ temp_configuration_table_layout['dist_style'] ~ ';') %}
+    {% endif %}
+    {% if configuration_table_layout['sort_key_columns'] != temp_configuration_table_layout['sort_key_columns'] %}
+        {% if temp_configuration_table_layout['sort_key_columns'] | length > 0 %}
+            {% do layout_changes.append('ALTER TABLE ' ~ schema_name ~ '.' ~ configuration_table_name ~ ' ALTER COMPOUND SORTKEY (' ~ temp_configuration_table_layout['sort_key_columns'] | join(', ') ~ ');') %}
+        {% else %}
+            {% do layout_changes.append('ALTER TABLE ' ~ schema_name ~ '.' ~ configuration_table_name ~ ' ALTER SORTKEY NONE;') %}
+        {% endif %}
+    {% endif %}
+
+    {{ return(layout_changes) }}
+{% endmacro %}
+
+{% macro get_configuration_table_layout(schema_name, configuration_table_name) %}
+    {%- set configuration_table_layout_query -%}
+        select
+            c.reldiststyle,
+            a.attname,
+            a.attsortkeyord
+        from pg_class_info c
+        join pg_namespace n on n.oid = c.relnamespace
+        join pg_attribute a on a.attrelid = c.reloid
+        where n.nspname = '{{ schema_name }}' and c.relname = '{{ configuration_table_name }}' and a.attnum > 0
+        order by a.attsortkeyord
+    {%- endset -%}
+
+    {% set configuration_table_layout_query_result = dbt.run_query(configuration_table_layout_query) %}
+    {% if configuration_table_layout_query_result.rows | length == 0 %} {{ return(none) }} {% endif %}
+
+    {# reldiststyle is 0 for EVEN, 1 for KEY, 8 for ALL and 10 or more for AUTO, whichever style Redshift picked #}
+    {% set reldiststyle = configuration_table_layout_query_result.rows[0].reldiststyle %}
+    {% set dist_style = 'AUTO' if reldiststyle >= 10 else {0: 'EVEN', 1: 'KEY', 8: 'ALL'}.get(reldiststyle) %}
+    {% set sort_key_columns = [] %}
+    {% for row in configuration_table_layout_query_result.rows %}
+        {% if row.attsortkeyord > 0 %}
+            {% do sort_key_columns.append(row.attname) %}
+        {% endif %}
+    {% endfor %}
+
+    {{ return({'dist_style': dist_style, 'sort_key_columns': sort_key_columns}) }}
+{% endmacro %}
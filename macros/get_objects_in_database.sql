@@ -1,23 +1,71 @@
-{% macro get_objects_in_database() %}
-    {% set objects_in_database = [] %}
-    {% set query %}
-    SELECT
-        table_catalog || '.' ||
-        table_schema || '.' ||
-        table_name || '.' ||
-        CASE
-            WHEN lower(table_type) = 'base table' THEN 'table'
-            ELSE 'view'
-        END AS full_table_name
-    FROM
-        information_schema.tables;
+{% macro stage_objects_in_database(config_table_names, max_rows_per_insert=1000) %}
+    {#
+        Stages tables and views of the schemas used in config_table_names in the session temp table
+        returned by this macro, so configuration rows are filtered by a join instead of a literal list of objects.
+        information_schema is available only on the leader node and can't be joined with the configuration tables,
+        so objects are read into the macro and inserted into the temp table.
+    #}
+    {% set staged_objects_table_name = 'dbt_am_objects_in_database' %}
+    {% set schema_queries = [] %}
+    {% for config_table_name in config_table_names %}
+        {% if get_config_table_created_timestamp(config_table_name) is not none %}
+            {% do schema_queries.append('SELECT DISTINCT schema_name FROM access_management.' ~ config_table_name) %}
+        {% endif %}
+    {% endfor %}
+    {% set schema_names = [] %}
+    {% if schema_queries | length > 0 %}
+        {% for row in run_query(schema_queries | join('\nUNION\n') ~ ';').rows %}
+            {% do schema_names.append(row.schema_name) %}
+        {% endfor %}
+    {% endif %}
+
+    {% set create_staged_objects_table_query %}
+        DROP TABLE IF EXISTS {{ staged_objects_table_name }};
+        CREATE TEMP TABLE {{ staged_objects_table_name }} (
+            database_name VARCHAR(256),
+            schema_name VARCHAR(256),
+            model_name VARCHAR(256),
+            object_type VARCHAR(16)
+        );
     {% endset %}
+    {% do run_query(create_staged_objects_table_query) %}
 
-    {% set objects_in_database_rows = run_query(query) %}
-    {% if objects_in_database_rows %}
-        {% for row in objects_in_database_rows %}
-            {% do objects_in_database.append(row.full_table_name) %}
+    {% set object_values = [] %}
+    {% if schema_names | length > 0 %}
+        {% set query_objects %}
+        SELECT
+            table_catalog,
+            table_schema,
+            table_name,
+            CASE
+                WHEN lower(table_type) = 'base table' THEN 'table'
+                ELSE 'view'
+            END AS object_type
+        FROM information_schema.tables
+        WHERE table_schema IN ({{ "'" ~ schema_names | join("', '") ~ "'" }});
+        {% endset %}
+        {% for row in run_query(query_objects).rows %}
+            {% do object_values.append("('" ~ [row.table_catalog, row.table_schema, row.table_name, row.object_type] | map('replace', "'", "''") | join("', '") ~ "')") %}
         {% endfor %}
     {% endif %}
-    {{ return(objects_in_database) }}
+    {% for object_values_batch in object_values | batch(max_rows_per_insert) %}
+        {% set insert_objects_query %}
+            INSERT INTO {{ staged_objects_table_name }} (database_name, schema_name, model_name, object_type)
+            VALUES {{ object_values_batch | join(',\n') }};
+        {% endset %}
+        {% do run_query(insert_objects_query) %}
+    {% endfor %}
+    {{ log("Staged " ~ object_values | length ~ " objects from " ~ schema_names | length ~ " schemas", info=True) }}
+    {{ return(staged_objects_table_name) }}
+{% endmacro %}
+
+{% macro get_object_in_database_condition(staged_objects_table_name, config_table_alias) %}
+    {# Semi-join of configuration rows with objects staged by stage_objects_in_database #}
+    EXISTS (
+        SELECT 1 FROM {{ staged_objects_table_name }} AS o
+        WHERE o.database_name = {{ config_table_alias }}.database_name
+        AND o.schema_name = {{ config_table_alias }}.schema_name
+        AND o.model_name = {{ config_table_alias }}.model_name
+        AND o.object_type = CASE WHEN lower({{ config_table_alias }}.materialization) = 'view' THEN 'view' ELSE 'table' END
+    )
 {% endmacro %}
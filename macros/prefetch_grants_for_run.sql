@@ -0,0 +1,156 @@
+{% macro prefetch_grants_for_run(skip_existing_grants=false) %}
+    {#
+        Intended for on-run-start. Loads database identities and grants of all selected models once
+        and keeps them in the graph, which is shared by all nodes of the run,
+        so execute_grants_for_model post-hooks don't query the database for them.
+        With skip_existing_grants privileges held in schemas of the selected models are loaded as well,
+        so post-hooks of relations kept by the run (incremental models, seeds and snapshots without full refresh)
+        execute only grants which are missing.
+    #}
+    {% if execute %}
+        {% set database_identities = dbt_access_management.get_database_identities() %}
+        {% set grants_per_model = {} %}
+        {% set schema_names = {} %}
+        {% for unique_id in selected_resources %}
+            {% set node = graph.nodes.get(unique_id) %}
+            {% if node and node.resource_type in ['model', 'seed', 'snapshot']
+                and node.package_name == project_name and node.config.materialized != 'ephemeral' %}
+                {% do grants_per_model.update({node.schema ~ '.' ~ node.name: []}) %}
+                {% do schema_names.update({node.schema: true}) %}
+            {% endif %}
+        {% endfor %}
+
+        {% set config_table_name = project_name ~ '_access_management_config' %}
+        {% if dbt_access_management.get_config_table_created_timestamp(config_table_name) is none %}
+            {# Post-hooks look grants up on their own, as without the prefetch #}
+            {% set grants_per_model = {} %}
+        {% else %}
+            {% set grants_per_model = dbt_access_management.get_grants_for_models(config_table_name, grants_per_model.keys() | list, database_identities) %}
+        {% endif %}
+
+        {% do graph.update({'dbt_access_management_run_cache': {
+            'database_identities': database_identities,
+            'grants_per_model': grants_per_model,
+            'existing_privileges': dbt_access_management.get_existing_privileges(schema_names.keys() | list)
+                if skip_existing_grants and grants_per_model | length > 0 else none
+        }}) %}
+        {{ log("Prefetched grants for " ~ grants_per_model | length ~ " models", info=True) }}
+    {% endif %}
+{% endmacro %}
+
+{% macro get_prefetched_grants_for_model() %}
+    {#
+        Returns grants of the current model loaded by prefetch_grants_for_run
+        or none when they were not prefetched.
+    #}
+    {% set run_cache = graph.get('dbt_access_management_run_cache') %}
+    {% if run_cache is none %}
+        {{ return(none) }}
+    {% endif %}
+    {{ return(run_cache['grants_per_model'].get(this.schema ~ '.' ~ this.name)) }}
+{% endmacro %}
+
+{% macro get_existing_privileges(schema_names) %}
+    {# Returns keys of privileges held by users, roles and groups on relations in schema_names and on the schemas #}
+    {% set existing_privileges = {} %}
+    {% if schema_names | length == 0 %}
+        {{ return(existing_privileges) }}
+    {% endif %}
+    {% set schema_names_in_clause = "'" ~ schema_names | join("', '") ~ "'" %}
+    {% set query_privileges %}
+        SELECT lower(privilege_type) || '|' || namespace_name || '.' || relation_name || '|' || identity_type || '|' || identity_name AS privilege_key
+        FROM svv_relation_privileges
+        WHERE namespace_name IN ({{ schema_names_in_clause }})
+        UNION ALL
+        SELECT lower(privilege_type) || '|SCHEMA ' || namespace_name || '|' || identity_type || '|' || identity_name AS privilege_key
+        FROM svv_schema_privileges
+        WHERE namespace_name IN ({{ schema_names_in_clause }});
+    {% endset %}
+    {% for row in dbt.run_query(query_privileges).rows %}
+        {% do existing_privileges.update({row.privilege_key: true}) %}
+    {% endfor %}
+    {{ return(existing_privileges) }}
+{% endmacro %}
+
+{% macro get_grant_privilege_key(grant) %}
+    {#
+        Returns the key of a privilege granted by a statement generated by dbt-am, e.g.
+            GRANT SELECT ON staging.user TO ROLE "role_1";
+        as `select|staging.user|role|role_1`, in the format of get_existing_privileges.
+    #}
+    {% set grant_parts = grant.strip().rstrip(';').split(' ON ', 1) %}
+    {% set target_parts = grant_parts[1].split(' TO ', 1) %}
+    {% set grantee = target_parts[1] %}
+    {% if grantee.startswith('ROLE ') %}
+        {% set identity_type = 'role' %}
+    {% elif grantee.startswith('GROUP ') %}
+        {% set identity_type = 'group' %}
+    {% else %}
+        {% set identity_type = 'user' %}
+    {% endif %}
+    {% set identity_name = grantee.split('"')[1] %}
+    {{ return(grant_parts[0].split(' ', 1)[1].lower() ~ '|' ~ target_parts[0] ~ '|' ~ identity_type ~ '|' ~ identity_name) }}
+{% endmacro %}
+
+{% macro get_missing_grants(grants) %}
+    {#
+        Returns grants of the current model which are not held yet, according to privileges loaded by prefetch_grants_for_run.
+        Relations created again by the run lost their privileges, so all their grants are returned.
+        GRANT ALL is always returned, as the catalog lists the single privileges.
+    #}
+    {% set run_cache = graph.get('dbt_access_management_run_cache') %}
+    {% set existing_privileges = run_cache['existing_privileges'] if run_cache is not none else none %}
+    {% if existing_privileges is none or flags.FULL_REFRESH or config.get('materialized') not in ['incremental', 'seed', 'snapshot'] %}
+        {{ return(grants) }}
+    {% endif %}
+    {% set missing_grants = [] %}
+    {% for grant in grants %}
+        {% if dbt_access_management.get_grant_privilege_key(grant) not in existing_privileges %}
+            {% do missing_grants.append(grant) %}
+        {% endif %}
+    {% endfor %}
+    {{ return(missing_grants) }}
+{% endmacro %}
+
+{% macro get_run_database_identities() %}
+    {# Returns database identities loaded by prefetch_grants_for_run or queries them when they were not prefetched #}
+    {% set run_cache = graph.get('dbt_access_management_run_cache') %}
+    {% if run_cache is none %}
+        {{ return(dbt_access_management.get_database_identities()) }}
+    {% endif %}
+    {{ return(run_cache['database_identities']) }}
+{% endmacro %}
+
+{% macro get_grants_for_models(config_table_name, model_keys, database_identities) %}
+    {# Returns grants for existing identities of every `schema.model` from model_keys #}
+    {% set grants_per_model = {} %}
+    {% for model_key in model_keys %}
+        {% do grants_per_model.update({model_key: []}) %}
+    {% endfor %}
+    {% if database_identities | length == 0 or grants_per_model | length == 0 %}
+        {{ return(grants_per_model) }}
+    {% endif %}
+
+    {% set identity_conditions = [] %}
+    {% for identity in database_identities %}
+        {% do identity_conditions.append("('" ~ identity['identity_type'] ~ "', '" ~ identity['identity_name'] ~ "')") %}
+    {% endfor %}
+    {% set model_conditions = [] %}
+    {% for model_key in grants_per_model.keys() %}
+        {% set model_key_parts = model_key.split('.', 1) %}
+        {% do model_conditions.append("('" ~ model_key_parts[0] ~ "', '" ~ model_key_parts[1] ~ "')") %}
+    {% endfor %}
+    {% set query_config_table %}
+        SELECT schema_name, model_name, json_parse(grants::varchar) AS grants
+        FROM access_management.{{config_table_name}}
+        WHERE (schema_name, model_name) IN ({{ model_conditions | join(", ") }})
+        AND (identity_type, identity_name) IN ({{ identity_conditions | join(", ") }});
+    {% endset %}
+    {% for row in dbt.run_query(query_config_table).rows %}
+        {% set model_key = row.schema_name ~ '.' ~ row.model_name %}
+        {% if model_key in grants_per_model %}
+            {% do grants_per_model[model_key].extend(fromjson(row.grants)) %}
+        {% endif %}
+    {% endfor %}
+    {{ return(grants_per_model) }}
+{% endmacro %}
@@ -1,18 +1,26 @@
-{% macro validate_configured_identities(config_table_name, should_stop_execution=True) %}
+{% macro validate_configured_identities(config_table_name, should_stop_execution=True, configured_identities=none) %}
     {% if execute %}
         {% set database_identities = get_database_identities() %}
 
-        {% set query_config_table_identities %}
-            SELECT identity_name AS identity_name, identity_type AS identity_type
-            FROM access_management.{{config_table_name}};
-        {% endset %}
+        {#
+            Identities passed from the configuration file are validated even when they have no rows in the config table,
+            which happens for identities without any matching config path in the sparse access management config
+        #}
+        {% if configured_identities is not none %}
+            {% set config_table_identities = configured_identities %}
+        {% else %}
+            {% set query_config_table_identities %}
+                SELECT identity_name AS identity_name, identity_type AS identity_type
+                FROM access_management.{{config_table_name}};
+            {% endset %}
 
-        {% set query_config_table_identities_result = dbt.run_query(query_config_table_identities) %}
-        {% set config_table_identities = [] %}
+            {% set query_config_table_identities_result = dbt.run_query(query_config_table_identities) %}
+            {% set config_table_identities = [] %}
 
-        {% for row in query_config_table_identities_result.rows %}
-            {% do config_table_identities.append({'identity_name': row.identity_name, 'identity_type': row.identity_type}) %}
-        {% endfor %}
+            {% for row in query_config_table_identities_result.rows %}
+                {% do config_table_identities.append({'identity_name': row.identity_name, 'identity_type': row.identity_type}) %}
+            {% endfor %}
+        {% endif %}
 
         {% set database_identities_mapped_to_list_of_strings = map_list_of_dicts_to_list_of_tuples(database_identities) %}
         {% set config_table_identities_mapped_to_list_of_strings = map_list_of_dicts_to_list_of_tuples(config_table_identities) %}